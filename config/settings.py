@@ -105,6 +105,7 @@ class Config:
     BIG_LOSS_THRESHOLD = 0.01     # 1% loss = exclusion
     PENALTY_MULTIPLIER = 3        # Penalty multiplier
     EXCLUSION_PERIOD = 3600       # Exclusion period in seconds
+    TRADE_HISTORY_MAX = 10000     # Trades kept in memory by RiskManager
     
     # Technical indicators
     RSI_PERIODS = [5, 6, 7, 8, 9, 10, 14]
@@ -160,6 +161,9 @@ class Config:
     
     # Sentiment analysis
     SENTIMENT_UPDATE_INTERVAL = 300
+    SENTIMENT_CACHE_TTL = {  # Per-source overrides of SENTIMENT_UPDATE_INTERVAL (seconds)
+        'fear_greed': 3600  # Index is published once a day
+    }
     TWITTER_BEARER_TOKEN = os.getenv('TWITTER_BEARER_TOKEN', '')
     REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID', '')
     REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET', '')
@@ -0,0 +1,244 @@
+# src/_indicators_njit.py
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # Numba is optional - kernels run as plain Python when it is missing
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
+
+
+@njit(cache=True)
+def _rsi_loop(prices: np.ndarray, period: int) -> np.ndarray:
+    """RSI over simple rolling means of gains/losses (NaN until warmed up)."""
+    n = prices.shape[0]
+    out = np.full(n, np.nan)
+    if n < period or period < 1:
+        return out
+
+    gains = np.zeros(n)
+    losses = np.zeros(n)
+    for i in range(1, n):
+        delta = prices[i] - prices[i - 1]
+        if delta > 0:
+            gains[i] = delta
+        elif delta < 0:
+            losses[i] = -delta
+
+    for i in range(period - 1, n):
+        gain_sum = 0.0
+        loss_sum = 0.0
+        for j in range(i - period + 1, i + 1):
+            gain_sum += gains[j]
+            loss_sum += losses[j]
+        avg_gain = gain_sum / period
+        avg_loss = loss_sum / period
+
+        if avg_loss > 0:
+            out[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        elif avg_gain > 0:
+            out[i] = 100.0
+
+    return out
+
+
+@njit(cache=True, error_model='numpy')
+def _scan_ohlcv_loop(close: np.ndarray, volume: np.ndarray,
+                     spike_multiplier: float, price_threshold: float):
+    """Volume spike, pump and dump and wash trading flags over the OHLCV tail."""
+    n = close.shape[0]
+    volume_spike = False
+    pump_and_dump = False
+    wash_trading = False
+
+    if n >= 20:
+        # 20-bar volume mean and sample std
+        vol_sum = 0.0
+        for i in range(n - 20, n):
+            vol_sum += volume[i]
+        vol_mean = vol_sum / 20
+        vol_sq = 0.0
+        for i in range(n - 20, n):
+            d = volume[i] - vol_mean
+            vol_sq += d * d
+        vol_std = np.sqrt(vol_sq / 19)
+
+        # Sample std of the last 20 returns (19 when only 20 closes exist)
+        start = n - 21 if n >= 21 else n - 20
+        m = n - 1 - start
+        ret_sum = 0.0
+        for i in range(start + 1, n):
+            ret_sum += (close[i] - close[i - 1]) / close[i - 1]
+        ret_mean = ret_sum / m
+        ret_sq = 0.0
+        for i in range(start + 1, n):
+            d = (close[i] - close[i - 1]) / close[i - 1] - ret_mean
+            ret_sq += d * d
+        ret_std = np.sqrt(ret_sq / (m - 1))
+
+        volume_spike = vol_mean > 0 and volume[n - 1] / vol_mean > spike_multiplier
+        wash_trading = (vol_mean > 0 and vol_std / vol_mean < 0.1) or ret_std < 0.0001
+
+    if n >= 10:
+        recent_max = -np.inf
+        recent_min = np.inf
+        has_nan = False
+        for i in range(n - 10, n):
+            x = close[i]
+            if x != x:
+                has_nan = True
+            if x > recent_max:
+                recent_max = x
+            if x < recent_min:
+                recent_min = x
+
+        if not has_nan:
+            current_price = close[n - 1]
+            pump_ratio = (recent_max - recent_min) / recent_min
+            dump_ratio = (recent_max - current_price) / recent_max
+            pump_and_dump = (recent_max != current_price and
+                             pump_ratio > price_threshold and
+                             dump_ratio > price_threshold)
+
+    return volume_spike, pump_and_dump, wash_trading
+
+
+@njit(cache=True)
+def _ema_state_loop(prices: np.ndarray, span: int):
+    """Numerator and weight of pandas' ewm(span=span, adjust=True) after the last price."""
+    decay = 1.0 - 2.0 / (span + 1.0)
+    num = 0.0
+    weight = 0.0
+    for i in range(prices.shape[0]):
+        num = prices[i] + decay * num
+        weight = 1.0 + decay * weight
+
+    return num, weight
+
+
+@njit(cache=True)
+def _wilder_rsi_state_loop(prices: np.ndarray, periods: np.ndarray):
+    """Bars seen and Wilder-smoothed average gains/losses per period, in one pass over the prices."""
+    n = prices.shape[0]
+    k = periods.shape[0]
+    alpha = 1.0 / periods
+    avg_gain = np.zeros(k)
+    avg_loss = np.zeros(k)
+
+    # The first bar has no change and counts as a zero gain and loss
+    for i in range(1, n):
+        delta = prices[i] - prices[i - 1]
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        for j in range(k):
+            avg_gain[j] = (1.0 - alpha[j]) * avg_gain[j] + alpha[j] * gain
+            avg_loss[j] = (1.0 - alpha[j]) * avg_loss[j] + alpha[j] * loss
+
+    return n, avg_gain, avg_loss
+
+
+@njit(cache=True)
+def _wilder_atr_state_loop(high: np.ndarray, low: np.ndarray, close: np.ndarray, periods: np.ndarray):
+    """Bars seen and the running ATR value per period (a true range sum until period bars are seen)."""
+    n = close.shape[0]
+    k = periods.shape[0]
+    values = np.zeros(k)
+    for i in range(n):
+        true_range = high[i] - low[i]
+        if i > 0:
+            true_range = max(true_range, abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+
+        # Seeded with the mean of the first period true ranges, then Wilder-smoothed
+        for j in range(k):
+            period = periods[j]
+            if i < period - 1:
+                values[j] += true_range
+            elif i == period - 1:
+                values[j] = (values[j] + true_range) / period
+            else:
+                values[j] = (values[j] * (period - 1) + true_range) / period
+
+    return n, values
+
+
+@njit(cache=True)
+def _vwap_state_loop(high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray):
+    """Kahan-compensated cumulative price * volume and volume sums, skipping NaN terms."""
+    pv_sum = 0.0
+    pv_comp = 0.0
+    v_sum = 0.0
+    v_comp = 0.0
+    for i in range(close.shape[0]):
+        pv = volume[i] * (high[i] + low[i] + close[i]) / 3
+        if pv == pv:
+            y = pv - pv_comp
+            t = pv_sum + y
+            pv_comp = (t - pv_sum) - y
+            pv_sum = t
+        if volume[i] == volume[i]:
+            y = volume[i] - v_comp
+            t = v_sum + y
+            v_comp = (t - v_sum) - y
+            v_sum = t
+
+    return pv_sum, pv_comp, v_sum, v_comp
+
+
+@njit(cache=True, error_model='numpy')
+def _volume_profile_loop(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                         volume: np.ndarray, window: int):
+    """Frame VWAP and the mean volume of the last window bars."""
+    n = close.shape[0]
+    if n == 0:
+        return np.nan, np.nan
+
+    # Compensated cumulative sums shared with the incremental VWAP state
+    pv_sum, _, v_sum, _ = _vwap_state_loop(high, low, close, volume)
+    window_sum = 0.0
+    for i in range(max(n - window, 0), n):
+        window_sum += volume[i]
+
+    # NaN terms are skipped, but a NaN on the last bar still leaves the last
+    # cumulative value NaN, like pandas' cumsum
+    last_pv = volume[n - 1] * (high[n - 1] + low[n - 1] + close[n - 1]) / 3
+    vwap = pv_sum / v_sum if last_pv == last_pv and volume[n - 1] == volume[n - 1] else np.nan
+    volume_sma = window_sum / window if n >= window else np.nan
+
+    return vwap, volume_sma
+
+
+@njit(cache=True)
+def _macd_state_loop(prices: np.ndarray, fast_span: int, slow_span: int, signal_span: int):
+    """MACD line per bar (NaN until the slow EMA warms up) and the final EMA state, as ta computes it."""
+    n = prices.shape[0]
+    macd = np.full(n, np.nan)
+    alpha_fast = 2.0 / (fast_span + 1.0)
+    alpha_slow = 2.0 / (slow_span + 1.0)
+    alpha_signal = 2.0 / (signal_span + 1.0)
+    fast = np.nan
+    slow = np.nan
+    signal = np.nan
+    macd_seen = 0
+    for i in range(n):
+        # pandas ewm(adjust=False) EMAs, starting at the first price
+        if i == 0:
+            fast = prices[0]
+            slow = prices[0]
+        else:
+            fast = (1.0 - alpha_fast) * fast + alpha_fast * prices[i]
+            slow = (1.0 - alpha_slow) * slow + alpha_slow * prices[i]
+
+        # The signal EMA starts at the first MACD value
+        if i + 1 >= slow_span:
+            value = fast - slow
+            macd[i] = value
+            if macd_seen == 0:
+                signal = value
+            else:
+                signal = (1.0 - alpha_signal) * signal + alpha_signal * value
+            macd_seen += 1
+
+    return macd, fast, slow, macd_seen, signal
@@ -477,4 +477,7 @@ class TradingBot:
         if summary:
             self.notifier.notify_daily_summary(summary)
         
+        # Stop background sentiment updates
+        self.market_analyzer.stop()
+        
         self.logger.info(f"Bot shutdown complete. KPI report saved to {kpi_report_file}")
\ No newline at end of file
@@ -51,7 +51,7 @@ class EnhancedDataCollector:
                 ohlcv = self.get_ohlcv_data(symbol, timeframe)
                 if ohlcv is not None:
                     # Calculate indicators for each timeframe
-                    indicators = self.indicators.calculate_all_indicators(ohlcv)
+                    indicators = self.indicators.calculate_all_indicators(ohlcv, key=(symbol, timeframe))
                     data['timeframes'][timeframe] = {
                         'ohlcv': ohlcv,
                         'indicators': indicators.copy()
@@ -17,6 +17,12 @@ class EnhancedRiskManager:
         self.system_paused = False
         self.pause_until = None
         self.leverage_multiplier = 1.0
+        self.trade_listeners = []  # Callables notified after each recorded trade
+        
+        # get_risk_report() cache, rebuilt only when state changed since last build
+        self._report_version = 0
+        self._report_cache_version = -1
+        self._report_cache = None
         
         # Advanced metrics
         self.volatility_history = []
@@ -35,6 +41,7 @@ class EnhancedRiskManager:
         """Set starting balance for daily calculations."""
         self.daily_starting_balance = balance
         self.daily_pnl = 0
+        self._report_version += 1
     
     def calculate_dynamic_leverage(self, symbol: str, market_data: Dict, 
                                  signal_strength: float) -> int:
@@ -175,6 +182,7 @@ class EnhancedRiskManager:
         if datetime.now() >= self.pause_until:
             self.system_paused = False
             self.pause_until = None
+            self._report_version += 1
             self.logger.info("System pause expired - trading resumed")
             return True
             
@@ -200,11 +208,18 @@ class EnhancedRiskManager:
             
             # Update risk metrics
             self._update_risk_metrics(trade)
+        
+        # Invalidate the cached report only once every field above is updated
+        self._report_version += 1
+        
+        for listener in self.trade_listeners:
+            listener()
     
     def _apply_system_pause(self):
         """Apply system pause due to consecutive losses."""
         self.system_paused = True
         self.pause_until = datetime.now() + timedelta(minutes=Config.SYSTEM_PAUSE_MINUTES)
+        self._report_version += 1
         
         self.logger.warning(
             f"System paused due to {self.consecutive_losses} consecutive losses. "
@@ -248,6 +263,8 @@ class EnhancedRiskManager:
                 # Gradually increase leverage if performing well
                 self.leverage_multiplier = min(Config.MAX_LEVERAGE_MULTIPLIER, 
                                              self.leverage_multiplier * Config.LEVERAGE_INCREASE_FACTOR)
+            
+            self._report_version += 1
     
     def calculate_stop_loss(self, entry_price: float, side: str, atr: float,
                           signal_strength: float = 70) -> float:
@@ -266,8 +283,17 @@ class EnhancedRiskManager:
             return entry_price * (1 + stop_distance)
     
     def get_risk_report(self) -> Dict:
-        """Generate comprehensive risk report."""
-        return {
+        """Generate comprehensive risk report.
+        
+        The report is cached until risk state changes; callers must not mutate it.
+        """
+        # Read the version before building, so a change made while building
+        # leaves the cache stale rather than stamped as current
+        version = self._report_version
+        if self._report_cache_version == version:
+            return self._report_cache
+        
+        self._report_cache = {
             'daily_pnl': self.daily_pnl,
             'daily_pnl_percent': (self.daily_pnl / self.daily_starting_balance * 100) 
                                if self.daily_starting_balance > 0 else 0,
@@ -279,4 +305,6 @@ class EnhancedRiskManager:
             'signal_accuracy': self.signal_accuracy,
             'total_trades': len(self.trade_history),
             'active_strategies': list(self.signal_accuracy.keys())
-        }
\ No newline at end of file
+        }
+        self._report_cache_version = version
+        return self._report_cache
\ No newline at end of file
@@ -54,8 +54,12 @@ class EnhancedTradingStrategy:
         if df is None or df.empty:
             return self._empty_signal()
         
-        # Calculate all indicators
-        self.indicators = self.indicators_calculator.calculate_all_indicators(df)
+        # Indicators for this frame, reusing the set computed alongside it by
+        # the data collector; copied since market metrics are added below
+        indicators = timeframe_data.get('indicators')
+        if indicators is None:
+            indicators = self.indicators_calculator.calculate_all_indicators(df, key=market_data.get('symbol'))
+        self.indicators = dict(indicators)
         
         # Add additional data to indicators
         self._add_market_metrics(market_data)
@@ -65,7 +69,7 @@ class EnhancedTradingStrategy:
             'action': None,
             'side': None,
             'reason': '',
-            'entry_price': df['close'].iloc[-1],
+            'entry_price': df['close'].to_numpy()[-1],
             'stop_loss': None,
             'take_profit': None,
             'tp1': None,
@@ -135,7 +139,7 @@ class EnhancedTradingStrategy:
         if df is None or df.empty:
             return None
         
-        last = df.iloc[-1]
+        last_close = df['close'].to_numpy()[-1]
         
         # Initialize scores for long and short
         long_score, long_reasons = self._calculate_long_score(market_data)
@@ -145,12 +149,12 @@ class EnhancedTradingStrategy:
         if long_score >= 0.7:
             strategy_type = self._determine_strategy_type(market_data)
             return self._create_enhanced_entry_signal(
-                'long', long_score, long_reasons, last, market_data, strategy_type
+                'long', long_score, long_reasons, last_close, market_data, strategy_type
             )
         elif short_score >= 0.7:
             strategy_type = self._determine_strategy_type(market_data)
             return self._create_enhanced_entry_signal(
-                'short', short_score, short_reasons, last, market_data, strategy_type
+                'short', short_score, short_reasons, last_close, market_data, strategy_type
             )
         
         return None
@@ -334,14 +338,14 @@ class EnhancedTradingStrategy:
             return 'scalping'
     
     def _create_enhanced_entry_signal(self, side: str, confidence: float, reasons: List[str], 
-                                    last: pd.Series, market_data: Dict, strategy_type: str) -> Dict:
+                                    last_close: float, market_data: Dict, strategy_type: str) -> Dict:
         """Create enhanced entry signal with limit orders and dynamic stops."""
         # Get OHLCV data for dynamic stops
         timeframe_data = market_data.get('timeframes', {}).get(Config.DEFAULT_TIMEFRAME, {})
         df = timeframe_data.get('ohlcv')
         
         # Use ATR-based stops
-        atr = self.indicators.get('atr_short', self.indicators.get('atr', last['close'] * 0.02))
+        atr = self.indicators.get('atr_short', self.indicators.get('atr', last_close * 0.02))
         
         # Calculate dynamic stop loss based on local extremes
         stop_loss, sl_buffer = self._calculate_dynamic_stop_loss(df, side, atr)
@@ -395,7 +399,7 @@ class EnhancedTradingStrategy:
         """Calculate dynamic stop loss based on local extremes."""
         if df is None or len(df) < self.LOCAL_EXTREMES_LOOKBACK:
             # Fallback to ATR-based stop
-            current_price = df['close'].iloc[-1] if df is not None else 0
+            current_price = df['close'].to_numpy()[-1] if df is not None else 0
             sl_buffer = atr * 1.5
             if side == 'long':
                 return current_price * (1 - sl_buffer), sl_buffer
@@ -403,12 +407,11 @@ class EnhancedTradingStrategy:
                 return current_price * (1 + sl_buffer), sl_buffer
         
         # Find local extremes
-        recent_data = df.iloc[-self.LOCAL_EXTREMES_LOOKBACK:]
+        lookback = self.LOCAL_EXTREMES_LOOKBACK
         
         if side == 'long':
             # Find recent low
-            local_low_idx = recent_data['low'].idxmin()
-            local_low = recent_data.loc[local_low_idx, 'low']
+            local_low = df['low'].to_numpy()[-lookback:].min()
             
             # Add buffer based on ATR
             sl_buffer = atr * 0.5
@@ -416,8 +419,7 @@ class EnhancedTradingStrategy:
             
         else:  # short
             # Find recent high
-            local_high_idx = recent_data['high'].idxmax()
-            local_high = recent_data.loc[local_high_idx, 'high']
+            local_high = df['high'].to_numpy()[-lookback:].max()
             
             # Add buffer based on ATR
             sl_buffer = atr * 0.5
@@ -463,7 +465,7 @@ class EnhancedTradingStrategy:
         if df is None or df.empty:
             return None
         
-        current_price = df['close'].iloc[-1]
+        current_price = df['close'].to_numpy()[-1]
         
         for position in positions:
             exit_conditions = []
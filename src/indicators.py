@@ -1,58 +1,290 @@
 # src/indicators.py
 import pandas as pd
 import numpy as np
-import ta
+from collections import deque
 from typing import Dict, List, Optional, Tuple
 from config.settings import Config
+from src._indicators_njit import (
+    _ema_state_loop, _wilder_rsi_state_loop, _wilder_atr_state_loop, _macd_state_loop, _vwap_state_loop
+)
+
+
+# Columns of the OHLC tail array used for pattern detection
+_OHLC = ('open', 'high', 'low', 'close')
+_OPEN, _HIGH, _LOW, _CLOSE = range(4)
+
+
+def _kahan_add(total: float, compensation: float, value: float) -> Tuple[float, float]:
+    """Add to a Kahan-compensated running sum; NaN terms are skipped like pandas' cumsum."""
+    if value != value:
+        return total, compensation
+    y = value - compensation
+    t = total + y
+    return t, (t - total) - y
+
+
+# Incremental indicator state, shared by TechnicalIndicators and SimpleIndicators.
+# The state holds the running values after the last closed bar; the last row of
+# each frame is the still-forming candle and is stepped on top of it on every call.
+def _new_price_state(ema_spans, rsi_periods, atr_periods) -> Dict:
+    """Empty close-price EMA, Wilder RSI and ATR state, before any bar."""
+    return {
+        'time': None,
+        'close': None,
+        'ema': {span: (0.0, 0.0) for span in ema_spans},  # (numerator, weight)
+        'rsi': {period: (0, 0.0, 0.0) for period in rsi_periods},  # (bars, avg gain, avg loss)
+        'atr': {period: (0, 0.0) for period in atr_periods}  # (bars, TR sum until seeded, then ATR)
+    }
+
+
+def _seed_price_state(state: Dict, high: np.ndarray, low: np.ndarray, close: np.ndarray):
+    """Fill the EMA, RSI and ATR state from the given closed bars with the compiled kernels."""
+    state['close'] = close[-1]
+    state['ema'] = {span: _ema_state_loop(close, span) for span in state['ema']}
+    
+    # One kernel pass each for all RSI periods and all ATR windows
+    rsi_periods = tuple(state['rsi'])
+    bars, avg_gains, avg_losses = _wilder_rsi_state_loop(close, np.array(rsi_periods, dtype=np.int64))
+    state['rsi'] = {
+        period: (bars, avg_gain, avg_loss)
+        for period, avg_gain, avg_loss in zip(rsi_periods, avg_gains.tolist(), avg_losses.tolist())
+    }
+    atr_periods = tuple(state['atr'])
+    bars, values = _wilder_atr_state_loop(high, low, close, np.array(atr_periods, dtype=np.int64))
+    state['atr'] = {period: (bars, value) for period, value in zip(atr_periods, values.tolist())}
+
+
+def _resume_index(state: Optional[Dict], times: Optional[np.ndarray], close: np.ndarray) -> Optional[int]:
+    """Index of the first bar not yet in the state, or None if the state must be rebuilt."""
+    if state is None or state['time'] is None or times is None:
+        return None
+    
+    # The last closed bar must still be in the frame, unchanged and closed
+    pos = int(np.searchsorted(times, state['time']))
+    if pos >= len(times) - 1 or times[pos] != state['time'] or close[pos] != state['close']:
+        return None
+    return pos + 1
+
+
+def _step_price_state(state: Dict, high: float, low: float, close: float) -> Dict:
+    """Advance the EMA, RSI and ATR state by one bar, returning the new values."""
+    prev_close = state['close']
+    if prev_close is None:
+        gain = loss = 0.0
+        true_range = high - low
+    else:
+        delta = close - prev_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else 0.0
+        true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    
+    # EMAs matching pandas ewm(span=...) with adjust=True
+    ema = {}
+    for span, (num, weight) in state['ema'].items():
+        decay = 1 - 2 / (span + 1)
+        ema[span] = (close + decay * num, 1.0 + decay * weight)
+    
+    # Wilder smoothing of gains and losses
+    rsi = {}
+    for period, (bars, avg_gain, avg_loss) in state['rsi'].items():
+        if bars == 0:
+            rsi[period] = (1, gain, loss)
+        else:
+            alpha = 1 / period
+            rsi[period] = (bars + 1, (1 - alpha) * avg_gain + alpha * gain,
+                           (1 - alpha) * avg_loss + alpha * loss)
+    
+    # ATRs seeded with the mean of their first true ranges
+    atr = {}
+    for period, (bars, value) in state['atr'].items():
+        if bars < period - 1:
+            atr[period] = (bars + 1, value + true_range)
+        elif bars == period - 1:
+            atr[period] = (bars + 1, (value + true_range) / period)
+        else:
+            atr[period] = (bars + 1, (value * (period - 1) + true_range) / period)
+    
+    return {
+        'time': state['time'],
+        'close': close,
+        'prev_close': prev_close,
+        'ema': ema,
+        'rsi': rsi,
+        'atr': atr
+    }
 
 
 class TechnicalIndicators:
     """Comprehensive technical indicators calculation."""
     
+    EMA_SPANS = (Config.EMA_VERY_SHORT, Config.EMA_SHORT, Config.EMA_LONG, Config.EMA_TREND)
+    VOLUME_EMA_SPANS = (5, 20)
+    ATR_PERIODS = (Config.ATR_PERIOD, Config.ATR_PERIOD_SHORT)
+    VOLUME_WINDOW = 20
+    DIVERGENCE_LOOKBACK = 20
+    PATTERN_LOOKBACK = 20
+    
+    # Closed closes kept for the SMAs, Bollinger Bands and divergence scan
+    CLOSE_HISTORY = max(max(Config.SMA_PERIODS), Config.BB_PERIOD, DIVERGENCE_LOOKBACK + 1) - 1
+    
     def __init__(self):
         self.indicators = {}
+        
+        # Running indicator state after the last closed bar, one per series
+        # key (e.g. symbol and timeframe)
+        self._states = {}
     
-    def calculate_all_indicators(self, df: pd.DataFrame) -> Dict:
+    def calculate_all_indicators(self, df: pd.DataFrame, key=None) -> Dict:
         """Calculate all technical indicators."""
+        open_ = df['open'].to_numpy(dtype=np.float64)
+        high = np.ascontiguousarray(df['high'].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(df['low'].to_numpy(dtype=np.float64))
+        close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+        volume = np.ascontiguousarray(df['volume'].to_numpy(dtype=np.float64))
+        times = df['timestamp'].to_numpy() if 'timestamp' in df.columns else None
+        
+        # Only bars closed since the previous call for this key are folded
+        # into the state; the first call (or a frame that does not continue
+        # it) seeds it from the whole frame
+        state = self._states.get(key)
+        start = _resume_index(state, times, close)
+        if start is None:
+            state = self._seed_state(high[:-1], low[:-1], close[:-1], volume[:-1])
+            state['time'] = times[-2] if times is not None and len(times) > 1 else None
+            start = len(close) - 1
+        
+        for i in range(start, len(close) - 1):
+            state = self._step(state, high[i], low[i], close[i], volume[i])
+            state['closes'].append(close[i])
+            state['volumes'].append(volume[i])
+            state['macd_history'].append(self._macd_values(state['macd'])[0])
+            state['time'] = times[i] if times is not None else None
+        self._states[key] = state
+        
+        current = self._step(state, high[-1], low[-1], close[-1], volume[-1])
+        closes = np.append(np.asarray(state['closes'], dtype=np.float64), close[-1])
         self.indicators = {}
         
         # Price action indicators
-        self.calculate_moving_averages(df)
-        self.calculate_bollinger_bands(df)
-        self.calculate_macd(df)
-        self.calculate_rsi(df)
+        self.calculate_moving_averages(state, current, closes)
+        self.calculate_bollinger_bands(closes)
+        self.calculate_macd(state, current, closes)
+        self.calculate_rsi(current)
         
         # Volume indicators
-        self.calculate_volume_indicators(df)
+        self.calculate_volume_indicators(state, current)
         
         # Volatility indicators
-        self.calculate_atr(df)
+        self.calculate_atr(current)
         
-        # Pattern detection
-        self.detect_candlestick_patterns(df)
+        # Pattern detection on the last bars, read by position from one small array
+        tail = slice(-self.PATTERN_LOOKBACK, None)
+        self.detect_candlestick_patterns(np.column_stack((open_[tail], high[tail], low[tail], close[tail])))
         
         return self.indicators
     
-    def calculate_moving_averages(self, df: pd.DataFrame):
+    def _new_state(self) -> Dict:
+        """Empty indicator state, before any bar."""
+        state = _new_price_state(self.EMA_SPANS, Config.RSI_PERIODS, self.ATR_PERIODS)
+        state.update({
+            'bars': 0,
+            'volume': None,
+            'volume_ema': {span: (0.0, 0.0) for span in self.VOLUME_EMA_SPANS},
+            'macd': (0, 0.0, 0.0, 0, np.nan),  # (bars, fast EMA, slow EMA, MACD values seen, signal EMA)
+            'vwap': (0.0, 0.0, 0.0, 0.0),  # Kahan sums of price * volume and volume, each with its compensation
+            'closes': deque(maxlen=self.CLOSE_HISTORY),
+            'volumes': deque(maxlen=self.VOLUME_WINDOW - 1),
+            'macd_history': deque(maxlen=self.DIVERGENCE_LOOKBACK - 1)
+        })
+        return state
+    
+    def _seed_state(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> Dict:
+        """Indicator state after the given closed bars, computed by the compiled kernels."""
+        state = self._new_state()
+        if not len(close):
+            return state
+        
+        _seed_price_state(state, high, low, close)
+        state['bars'] = len(close)
+        state['volume'] = volume[-1]
+        state['volume_ema'] = {span: _ema_state_loop(volume, span) for span in self.VOLUME_EMA_SPANS}
+        
+        macd, fast, slow, macd_seen, signal = _macd_state_loop(
+            close, Config.MACD_FAST, Config.MACD_SLOW, Config.MACD_SIGNAL
+        )
+        state['macd'] = (len(close), fast, slow, macd_seen, signal)
+        
+        state['vwap'] = _vwap_state_loop(high, low, close, volume)
+        state['closes'].extend(close[-state['closes'].maxlen:])
+        state['volumes'].extend(volume[-state['volumes'].maxlen:])
+        state['macd_history'].extend(macd[-state['macd_history'].maxlen:])
+        return state
+    
+    def _step(self, state: Dict, high: float, low: float, close: float, volume: float) -> Dict:
+        """Advance the state by one bar, returning the new state."""
+        new_state = _step_price_state(state, high, low, close)
+        
+        # Volume EMAs, with the same recurrence as the close EMAs
+        volume_ema = {}
+        for span, (num, weight) in state['volume_ema'].items():
+            decay = 1 - 2 / (span + 1)
+            volume_ema[span] = (volume + decay * num, 1.0 + decay * weight)
+        
+        # MACD from adjust=False EMAs; the signal line starts at the first MACD value
+        bars, fast, slow, macd_seen, signal = state['macd']
+        if bars == 0:
+            fast = slow = close
+        else:
+            alpha_fast = 2 / (Config.MACD_FAST + 1)
+            alpha_slow = 2 / (Config.MACD_SLOW + 1)
+            fast = (1 - alpha_fast) * fast + alpha_fast * close
+            slow = (1 - alpha_slow) * slow + alpha_slow * close
+        if bars + 1 >= Config.MACD_SLOW:
+            alpha_signal = 2 / (Config.MACD_SIGNAL + 1)
+            signal = fast - slow if macd_seen == 0 else (1 - alpha_signal) * signal + alpha_signal * (fast - slow)
+            macd_seen += 1
+        
+        # Cumulative VWAP sums, compensated against drift over a long-running state
+        vwap_num, num_comp, vwap_den, den_comp = state['vwap']
+        vwap_num, num_comp = _kahan_add(vwap_num, num_comp, volume * (high + low + close) / 3)
+        vwap_den, den_comp = _kahan_add(vwap_den, den_comp, volume)
+        
+        new_state.update({
+            'bars': state['bars'] + 1,
+            'volume': volume,
+            'prev_volume': state['volume'],
+            'volume_ema': volume_ema,
+            'macd': (bars + 1, fast, slow, macd_seen, signal),
+            'vwap': (vwap_num, num_comp, vwap_den, den_comp),
+            'closes': state['closes'],
+            'volumes': state['volumes'],
+            'macd_history': state['macd_history']
+        })
+        return new_state
+    
+    def _macd_values(self, macd_state: Tuple) -> Tuple[float, float]:
+        """MACD and signal line values of a MACD state (NaN until warmed up)."""
+        bars, fast, slow, macd_seen, signal = macd_state
+        macd = fast - slow if bars >= Config.MACD_SLOW else np.nan
+        macd_signal = signal if macd_seen >= Config.MACD_SIGNAL else np.nan
+        return macd, macd_signal
+    
+    def calculate_moving_averages(self, state: Dict, current: Dict, closes: np.ndarray):
         """Calculate EMA and SMA indicators."""
         # EMAs
-        self.indicators['ema_5'] = df['close'].ewm(span=Config.EMA_VERY_SHORT).mean().iloc[-1]
-        self.indicators['ema_9'] = df['close'].ewm(span=Config.EMA_SHORT).mean().iloc[-1]
-        self.indicators['ema_21'] = df['close'].ewm(span=Config.EMA_LONG).mean().iloc[-1]
-        self.indicators['ema_50'] = df['close'].ewm(span=Config.EMA_TREND).mean().iloc[-1]
+        for span, (num, weight) in current['ema'].items():
+            self.indicators[f'ema_{span}'] = num / weight
         
         # SMAs
         for period in Config.SMA_PERIODS:
-            self.indicators[f'sma_{period}'] = df['close'].rolling(window=period).mean().iloc[-1]
-        
-        # EMA Crossovers
-        ema_short = df['close'].ewm(span=Config.EMA_SHORT).mean()
-        ema_long = df['close'].ewm(span=Config.EMA_LONG).mean()
+            self.indicators[f'sma_{period}'] = closes[-period:].mean() if len(closes) >= period else np.nan
         
         # Check for crossover
-        if len(df) >= 2:
-            current_diff = ema_short.iloc[-1] - ema_long.iloc[-1]
-            prev_diff = ema_short.iloc[-2] - ema_long.iloc[-2]
+        if current['bars'] >= 2:
+            current_diff = self.indicators[f'ema_{Config.EMA_SHORT}'] - self.indicators[f'ema_{Config.EMA_LONG}']
+            short_num, short_weight = state['ema'][Config.EMA_SHORT]
+            long_num, long_weight = state['ema'][Config.EMA_LONG]
+            prev_diff = short_num / short_weight - long_num / long_weight
             
             if current_diff > 0 and prev_diff <= 0:
                 self.indicators['ema_crossover'] = 'bullish'
@@ -77,28 +309,29 @@ class TechnicalIndicators:
         else:
             self.indicators['trend'] = 'neutral'
     
-    def calculate_bollinger_bands(self, df: pd.DataFrame):
+    def calculate_bollinger_bands(self, closes: np.ndarray):
         """Calculate Bollinger Bands and detect squeeze."""
-        bb_indicator = ta.volatility.BollingerBands(
-            close=df['close'],
-            window=Config.BB_PERIOD,
-            window_dev=Config.BB_STD
-        )
+        if len(closes) >= Config.BB_PERIOD:
+            window = closes[-Config.BB_PERIOD:]
+            bb_middle = window.mean()
+            bb_std = window.std()  # ddof=0, as ta uses
+        else:
+            bb_middle = bb_std = np.nan
         
-        self.indicators['bb_upper'] = bb_indicator.bollinger_hband().iloc[-1]
-        self.indicators['bb_middle'] = bb_indicator.bollinger_mavg().iloc[-1]
-        self.indicators['bb_lower'] = bb_indicator.bollinger_lband().iloc[-1]
+        self.indicators['bb_upper'] = bb_middle + Config.BB_STD * bb_std
+        self.indicators['bb_middle'] = bb_middle
+        self.indicators['bb_lower'] = bb_middle - Config.BB_STD * bb_std
         
         # Bollinger Band width
         bb_width = (self.indicators['bb_upper'] - self.indicators['bb_lower']) / self.indicators['bb_middle']
         self.indicators['bb_width'] = bb_width
         
         # Detect Bollinger Band squeeze
+        current_price = closes[-1]
         if bb_width < Config.BB_SQUEEZE_THRESHOLD:
             self.indicators['bb_squeeze'] = True
             
             # Determine squeeze direction
-            current_price = df['close'].iloc[-1]
             if current_price > self.indicators['bb_middle']:
                 self.indicators['bb_squeeze_direction'] = 'bullish'
             else:
@@ -108,7 +341,6 @@ class TechnicalIndicators:
             self.indicators['bb_squeeze_direction'] = 'none'
         
         # Price position relative to bands
-        current_price = df['close'].iloc[-1]
         if current_price > self.indicators['bb_upper']:
             self.indicators['bb_position'] = 'above'
         elif current_price < self.indicators['bb_lower']:
@@ -116,25 +348,17 @@ class TechnicalIndicators:
         else:
             self.indicators['bb_position'] = 'inside'
     
-    def calculate_macd(self, df: pd.DataFrame):
+    def calculate_macd(self, state: Dict, current: Dict, closes: np.ndarray):
         """Calculate MACD and detect divergences."""
-        macd_indicator = ta.trend.MACD(
-            close=df['close'],
-            window_slow=Config.MACD_SLOW,
-            window_fast=Config.MACD_FAST,
-            window_sign=Config.MACD_SIGNAL
-        )
+        current_macd, current_signal = self._macd_values(current['macd'])
         
-        self.indicators['macd'] = macd_indicator.macd().iloc[-1]
-        self.indicators['macd_signal'] = macd_indicator.macd_signal().iloc[-1]
-        self.indicators['macd_histogram'] = macd_indicator.macd_diff().iloc[-1]
+        self.indicators['macd'] = current_macd
+        self.indicators['macd_signal'] = current_signal
+        self.indicators['macd_histogram'] = current_macd - current_signal
         
         # MACD crossover
-        if len(df) >= 2:
-            current_macd = macd_indicator.macd().iloc[-1]
-            current_signal = macd_indicator.macd_signal().iloc[-1]
-            prev_macd = macd_indicator.macd().iloc[-2]
-            prev_signal = macd_indicator.macd_signal().iloc[-2]
+        if current['bars'] >= 2:
+            prev_macd, prev_signal = self._macd_values(state['macd'])
             
             if current_macd > current_signal and prev_macd <= prev_signal:
                 self.indicators['macd_crossover'] = 'bullish'
@@ -144,36 +368,39 @@ class TechnicalIndicators:
                 self.indicators['macd_crossover'] = 'none'
         
         # MACD divergence detection
-        if len(df) >= 20:
-            self._detect_macd_divergence(df, macd_indicator)
+        if current['bars'] >= self.DIVERGENCE_LOOKBACK:
+            self._detect_macd_divergence(state, closes)
     
-    def _detect_macd_divergence(self, df: pd.DataFrame, macd_indicator):
+    def _detect_macd_divergence(self, state: Dict, closes: np.ndarray):
         """Detect MACD divergences."""
-        macd_line = macd_indicator.macd()
-        prices = df['close']
-        
         # Look for divergences in last 20 bars
-        lookback = 20
-        if len(df) < lookback:
+        lookback = self.DIVERGENCE_LOOKBACK
+        macd_line = state['macd_history']
+        if len(closes) <= lookback or len(macd_line) < lookback - 1:
             self.indicators['macd_divergence'] = 'none'
             return
         
+        # Prices from 21 bars back to the current one; MACD of the closed
+        # bars among them that can be local extremes
+        prices = closes[-lookback - 1:]
+        macd_line = list(macd_line)
+        
         # Find local extremes
         price_highs = []
         price_lows = []
         macd_highs = []
         macd_lows = []
         
-        for i in range(-lookback, -1):
+        for i in range(1, lookback):
             # Local high
-            if prices.iloc[i] > prices.iloc[i-1] and prices.iloc[i] > prices.iloc[i+1]:
-                price_highs.append((i, prices.iloc[i]))
-                macd_highs.append((i, macd_line.iloc[i]))
+            if prices[i] > prices[i-1] and prices[i] > prices[i+1]:
+                price_highs.append((i, prices[i]))
+                macd_highs.append((i, macd_line[i-1]))
             
             # Local low
-            if prices.iloc[i] < prices.iloc[i-1] and prices.iloc[i] < prices.iloc[i+1]:
-                price_lows.append((i, prices.iloc[i]))
-                macd_lows.append((i, macd_line.iloc[i]))
+            if prices[i] < prices[i-1] and prices[i] < prices[i+1]:
+                price_lows.append((i, prices[i]))
+                macd_lows.append((i, macd_line[i-1]))
         
         # Check for bearish divergence (price higher high, MACD lower high)
         if len(price_highs) >= 2 and len(macd_highs) >= 2:
@@ -189,13 +416,15 @@ class TechnicalIndicators:
         
         self.indicators['macd_divergence'] = 'none'
     
-    def calculate_rsi(self, df: pd.DataFrame):
+    def calculate_rsi(self, current: Dict):
         """Calculate RSI for multiple periods and detect conditions."""
-        for period in Config.RSI_PERIODS:
-            rsi_value = ta.momentum.RSIIndicator(
-                close=df['close'], 
-                window=period
-            ).rsi().iloc[-1]
+        for period, (bars, avg_gain, avg_loss) in current['rsi'].items():
+            if bars < period:
+                rsi_value = np.nan
+            elif avg_loss == 0:
+                rsi_value = 100.0
+            else:
+                rsi_value = 100 - 100 / (1 + avg_gain / avg_loss)
             
             self.indicators[f'rsi_{period}'] = rsi_value
             
@@ -212,70 +441,63 @@ class TechnicalIndicators:
                 else:
                     self.indicators['rsi_condition'] = 'neutral'
     
-    def calculate_volume_indicators(self, df: pd.DataFrame):
+    def calculate_volume_indicators(self, state: Dict, current: Dict):
         """Calculate volume-based indicators."""
-        # Volume analysis
-        volume_sma = df['volume'].rolling(window=20).mean()
-        self.indicators['volume_ratio'] = df['volume'].iloc[-1] / volume_sma.iloc[-1] if volume_sma.iloc[-1] > 0 else 1
-        self.indicators['volume_sma_20'] = volume_sma.iloc[-1]
+        volume = current['volume']
+        
+        # Volume analysis against the 20-bar average including the current bar
+        volumes = state['volumes']
+        volume_sma = (sum(volumes) + volume) / self.VOLUME_WINDOW if len(volumes) == volumes.maxlen else np.nan
+        self.indicators['volume_ratio'] = volume / volume_sma if volume_sma > 0 else 1
+        self.indicators['volume_sma_20'] = volume_sma
         
         # Volume spike detection
         self.indicators['volume_spike'] = self.indicators['volume_ratio'] > Config.VOLUME_SPIKE_THRESHOLD
         self.indicators['volume_spike_extreme'] = self.indicators['volume_ratio'] > Config.VOLUME_SPIKE_EXTREME
         
         # One-minute 500% volume spike
-        if len(df) > 1:
-            volume_change = df['volume'].iloc[-1] / df['volume'].iloc[-2] if df['volume'].iloc[-2] > 0 else 1
+        prev_volume = current['prev_volume']
+        if prev_volume is not None:
+            volume_change = volume / prev_volume if prev_volume > 0 else 1
             self.indicators['volume_spike_500'] = volume_change > 5.0
         else:
             self.indicators['volume_spike_500'] = False
         
         # Volume trend
-        volume_ema_short = df['volume'].ewm(span=5).mean()
-        volume_ema_long = df['volume'].ewm(span=20).mean()
-        
-        if volume_ema_short.iloc[-1] > volume_ema_long.iloc[-1]:
+        (short_num, short_weight), (long_num, long_weight) = current['volume_ema'].values()
+        if short_num / short_weight > long_num / long_weight:
             self.indicators['volume_trend'] = 'increasing'
         else:
             self.indicators['volume_trend'] = 'decreasing'
         
         # VWAP
-        vwap = (df['volume'] * (df['high'] + df['low'] + df['close']) / 3).cumsum() / df['volume'].cumsum()
-        self.indicators['vwap'] = vwap.iloc[-1]
+        vwap_num, _, vwap_den, _ = current['vwap']
+        self.indicators['vwap'] = vwap_num / vwap_den if vwap_den else np.nan
     
-    def calculate_atr(self, df: pd.DataFrame):
+    def calculate_atr(self, current: Dict):
         """Calculate ATR for different periods."""
+        close = current['close']
+        bars, value = current['atr'][Config.ATR_PERIOD]
+        short_bars, short_value = current['atr'][Config.ATR_PERIOD_SHORT]
+        
         # Standard ATR
-        atr_indicator = ta.volatility.AverageTrueRange(
-            high=df['high'], 
-            low=df['low'], 
-            close=df['close'], 
-            window=Config.ATR_PERIOD
-        )
-        self.indicators['atr'] = atr_indicator.average_true_range().iloc[-1]
+        self.indicators['atr'] = value if bars >= Config.ATR_PERIOD else np.nan
         
         # Short-term ATR
-        atr_short = ta.volatility.AverageTrueRange(
-            high=df['high'], 
-            low=df['low'], 
-            close=df['close'], 
-            window=Config.ATR_PERIOD_SHORT
-        )
-        self.indicators['atr_short'] = atr_short.average_true_range().iloc[-1]
+        self.indicators['atr_short'] = short_value if short_bars >= Config.ATR_PERIOD_SHORT else np.nan
         
         # ATR percentage
-        self.indicators['atr_percent'] = self.indicators['atr'] / df['close'].iloc[-1] * 100
+        self.indicators['atr_percent'] = self.indicators['atr'] / close * 100
     
-    def detect_candlestick_patterns(self, df: pd.DataFrame):
-        """Detect candlestick patterns."""
-        if len(df) < 5:
+    def detect_candlestick_patterns(self, tail: np.ndarray):
+        """Detect candlestick patterns on the last bars, one row per bar of _OHLC columns."""
+        if len(tail) < 5:
             self._set_empty_patterns()
             return
         
         # Current and previous candles
-        current = df.iloc[-1]
-        prev = df.iloc[-2]
-        prev2 = df.iloc[-3]
+        current = dict(zip(_OHLC, tail[-1].tolist()))
+        prev = dict(zip(_OHLC, tail[-2].tolist()))
         
         # Engulfing patterns
         self._detect_engulfing(current, prev)
@@ -284,10 +506,10 @@ class TechnicalIndicators:
         self._detect_pin_bar(current, prev)
         
         # Breakout patterns
-        self._detect_breakout(df)
+        self._detect_breakout(tail)
         
         # Low/High trap patterns
-        self._detect_traps(df)
+        self._detect_traps(tail)
     
     def _set_empty_patterns(self):
         """Set all pattern indicators to 'none'."""
@@ -296,7 +518,7 @@ class TechnicalIndicators:
         self.indicators['pattern_breakout'] = 'none'
         self.indicators['pattern_trap'] = 'none'
     
-    def _detect_engulfing(self, current: pd.Series, prev: pd.Series):
+    def _detect_engulfing(self, current: Dict, prev: Dict):
         """Detect engulfing patterns."""
         # Bullish engulfing
         if (prev['close'] < prev['open'] and  # Previous bearish
@@ -314,7 +536,7 @@ class TechnicalIndicators:
         else:
             self.indicators['pattern_engulfing'] = 'none'
     
-    def _detect_pin_bar(self, current: pd.Series, prev: pd.Series):
+    def _detect_pin_bar(self, current: Dict, prev: Dict):
         """Detect pin bar patterns."""
         body_size = abs(current['close'] - current['open'])
         upper_wick = current['high'] - max(current['close'], current['open'])
@@ -336,16 +558,16 @@ class TechnicalIndicators:
         else:
             self.indicators['pattern_pin_bar'] = 'none'
     
-    def _detect_breakout(self, df: pd.DataFrame):
+    def _detect_breakout(self, tail: np.ndarray):
         """Detect breakout patterns."""
-        lookback = 20
-        if len(df) < lookback:
+        lookback = self.PATTERN_LOOKBACK
+        if len(tail) < lookback:
             self.indicators['pattern_breakout'] = 'none'
             return
         
-        current_price = df['close'].iloc[-1]
-        recent_high = df['high'].iloc[-lookback:-1].max()
-        recent_low = df['low'].iloc[-lookback:-1].min()
+        current_price = tail[-1, _CLOSE]
+        recent_high = tail[-lookback:-1, _HIGH].max()
+        recent_low = tail[-lookback:-1, _LOW].min()
         
         # Breakout detection
         if current_price > recent_high:
@@ -359,22 +581,22 @@ class TechnicalIndicators:
         self.indicators['resistance'] = recent_high
         self.indicators['support'] = recent_low
     
-    def _detect_traps(self, df: pd.DataFrame):
+    def _detect_traps(self, tail: np.ndarray):
         """Detect low/high trap patterns."""
-        if len(df) < 10:
+        if len(tail) < 10:
             self.indicators['pattern_trap'] = 'none'
             return
         
         # Low trap: false breakdown followed by recovery
-        recent_low = df['low'].iloc[-10:-2].min()
-        if (df['low'].iloc[-2] < recent_low and  # Break below recent low
-            df['close'].iloc[-1] > recent_low):  # Close back above
+        recent_low = tail[-10:-2, _LOW].min()
+        if (tail[-2, _LOW] < recent_low and  # Break below recent low
+            tail[-1, _CLOSE] > recent_low):  # Close back above
             self.indicators['pattern_trap'] = 'low_trap'
         
         # High trap: false breakout followed by reversal
-        recent_high = df['high'].iloc[-10:-2].max()
-        if (df['high'].iloc[-2] > recent_high and  # Break above recent high
-            df['close'].iloc[-1] < recent_high):  # Close back below
+        recent_high = tail[-10:-2, _HIGH].max()
+        if (tail[-2, _HIGH] > recent_high and  # Break above recent high
+            tail[-1, _CLOSE] < recent_high):  # Close back below
             self.indicators['pattern_trap'] = 'high_trap'
         else:
             self.indicators['pattern_trap'] = 'none'
\ No newline at end of file
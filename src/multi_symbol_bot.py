@@ -157,19 +157,20 @@ class MultiSymbolTradingBot:
     
     def _analyze_symbol(self, symbol: str, market_data: Dict, sentiment: Dict) -> Optional[Dict]:
         """Analyze single symbol for trading opportunities."""
-        # Check for market anomalies
-        anomaly_check = self.security_filters.check_market_anomaly(market_data)
-        if anomaly_check['is_anomaly'] and anomaly_check['recommendation'] == 'block_signal':
-            self.logger.warning(f"{symbol}: Market anomaly detected - blocking signals")
-            return None
-        
         # Get positions for this symbol
         positions = self._get_positions_for_symbol(symbol)
         
-        # Check if max positions reached for this symbol
+        # Check if max positions reached for this symbol; this cheap gate
+        # runs before the OHLCV scan, which a capped symbol never needs
         if len(positions) >= Config.MAX_POSITIONS_PER_SYMBOL:
             return None
         
+        # Check for market anomalies
+        anomaly_check = self.security_filters.check_market_anomaly(market_data)
+        if anomaly_check['is_anomaly'] and anomaly_check['recommendation'] == 'block_signal':
+            self.logger.warning(f"{symbol}: Market anomaly detected - blocking signals")
+            return None
+        
         # Generate trading signal using enhanced strategy
         signal = self.enhanced_strategy.generate_signal(market_data, positions)
         
@@ -510,4 +511,8 @@ class MultiSymbolTradingBot:
         }
         
         self.notifier.notify_shutdown()
+        
+        # Stop background sentiment updates
+        self.market_analyzer.stop()
+        
         self.logger.info(f"Multi-Symbol Bot shutdown complete")
\ No newline at end of file
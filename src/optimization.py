@@ -1,14 +1,202 @@
 # src/optimization.py
-import schedule
-import time
+import asyncio
+import csv
 import logging
+import io
+import multiprocessing
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List
 from src.ml_models import MLPredictor
+from src._indicators_njit import _rsi_loop
 from config.settings import Config
 
+# pyarrow's multithreaded CSV reader is optional - fall back to pandas' C parser
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# bottleneck's C moving-window functions are optional - fall back to pandas' rolling
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+
+TRADING_HISTORY_FILE = 'trading_history.csv'
+
+# Hour-of-day -> inside Config.HIGH_LIQUIDITY_HOURS
+_HIGH_LIQ_MASK = np.zeros(24, dtype=bool)
+_HIGH_LIQ_MASK[slice(*Config.HIGH_LIQUIDITY_HOURS)] = True
+
+
+# Only these columns are read by the optimizer; the rest are skipped at parse time
+HISTORY_COLUMNS = ['timestamp', 'action', 'pnl', 'size']
+
+# path -> {'ino', 'offset', 'names', 'df'}; the history file is append-only,
+# so only bytes written since the last load need to be parsed
+_HISTORY_CACHE = {}
+
+
+def _parse_history_rows(data: bytes, names: List[str]) -> pd.DataFrame:
+    """Parse complete CSV rows (without header) into the optimizer's column subset."""
+    if PYARROW_AVAILABLE:
+        table = pacsv.read_csv(
+            io.BytesIO(data),
+            read_options=pacsv.ReadOptions(column_names=names),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=HISTORY_COLUMNS,
+                column_types={'pnl': pa.float64(), 'size': pa.float64()}
+            )
+        )
+        df = table.to_pandas()
+    else:
+        df = pd.read_csv(
+            io.BytesIO(data),
+            header=None,
+            names=names,
+            usecols=HISTORY_COLUMNS,
+            dtype={'pnl': np.float64, 'size': np.float64}
+        )
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df
+
+
+def load_trading_history(path: str = TRADING_HISTORY_FILE) -> pd.DataFrame:
+    """Load trading history, parsing only rows appended since the previous call.
+    
+    The returned DataFrame is shared between callers and must not be mutated.
+    """
+    stat = os.stat(path)
+    cached = _HISTORY_CACHE.get(path)
+    
+    # Rotated or truncated file - start over
+    if cached and (cached['ino'] != stat.st_ino or stat.st_size < cached['offset']):
+        cached = None
+    if cached and stat.st_size == cached['offset']:
+        return cached['df']
+    
+    offset = cached['offset'] if cached else 0
+    with open(path, 'rb') as file:
+        file.seek(offset)
+        data = file.read()
+    
+    # Ignore a row that is still being written
+    complete = data.rfind(b'\n') + 1
+    if cached and not complete:
+        return cached['df']
+    data = data[:complete] if complete else data
+    
+    if cached:
+        names = cached['names']
+        df = pd.concat([cached['df'], _parse_history_rows(data, names)], ignore_index=True)
+    else:
+        header_end = data.find(b'\n') + 1
+        names = next(csv.reader([data[:header_end].decode().strip()]))
+        df = _parse_history_rows(data[header_end:], names)
+    
+    _HISTORY_CACHE[path] = {
+        'ino': stat.st_ino,
+        'offset': offset + len(data),
+        'names': names,
+        'df': df
+    }
+    return df
+
+
+def prepare_training_data(df: pd.DataFrame) -> tuple:
+    """Build (X, y) for model training from OHLCV bars; df itself is not modified."""
+    close = df['close'].to_numpy(dtype=np.float64)
+    volume = df['volume'].to_numpy(dtype=np.float64)
+    
+    # Technical indicators, as local arrays
+    rsi = _rsi_loop(close, 14)
+    if BOTTLENECK_AVAILABLE:
+        volume_sma = bn.move_mean(volume, 20, min_count=20)
+    else:
+        volume_sma = df['volume'].rolling(20).mean().to_numpy()
+    volume_ratio = volume / volume_sma
+    price_change = df['close'].pct_change().to_numpy(dtype=np.float64)
+    
+    # Create labels (future price direction); the 5-bar forward return is
+    # divided and shifted in place on the close array, without temporaries
+    future_return = np.full(len(close), np.nan)
+    np.divide(close[5:], close[:-5], out=future_return[:-5])
+    future_return[:-5] -= 1
+    label = (future_return > 0.001).astype(np.int64) - (future_return < -0.001)
+    
+    # Prepare feature matrix from the rows where neither the bars nor any feature is missing
+    X = np.column_stack((rsi, volume_ratio, price_change))
+    valid = df.notna().all(axis=1).to_numpy() & ~np.isnan(X).any(axis=1) & ~np.isnan(future_return)
+    
+    return X[valid], label[valid]
+
+
+def hourly_loss_stats(path: str) -> tuple:
+    """Find low-liquidity hours with frequent, large losses.
+    
+    Returns (low_liquidity_hours, loss_counts, avg_losses); the arrays are indexed by hour.
+    """
+    df = load_trading_history(path)
+    if df.empty:
+        return [], np.zeros(24, dtype=np.int64), np.zeros(24)
+    
+    # Identify losing trades
+    pnl = df['pnl'].to_numpy(dtype=np.float64)
+    losing = (df['action'].to_numpy() == 'close') & (pnl < 0)
+    hours = df['timestamp'].dt.hour.to_numpy()[losing].astype(np.int64)
+    
+    # Analyze by hour (liquidity proxy)
+    loss_counts = np.bincount(hours, minlength=24)
+    loss_sums = np.bincount(hours, weights=pnl[losing], minlength=24)
+    avg_losses = loss_sums / np.maximum(loss_counts, 1)
+    
+    # Identify problematic hours (low liquidity)
+    problematic = (loss_counts > 3) & (avg_losses < -10) & ~_HIGH_LIQ_MASK  # Threshold
+    return np.flatnonzero(problematic).tolist(), loss_counts, avg_losses
+
+
+def trade_history_metrics(path: str) -> Dict:
+    """Win rate, profit factor and Sharpe ratio of closed trades (empty if there are none)."""
+    metrics = {}
+    df = load_trading_history(path)
+    if df.empty:
+        return metrics
+    
+    closed = (df['action'] == 'close').to_numpy()
+    if not closed.any():
+        return metrics
+    
+    pnl = df['pnl'].to_numpy(dtype=np.float64)[closed]
+    size = df['size'].to_numpy(dtype=np.float64)[closed]
+    
+    wins = pnl > 0
+    metrics['win_rate'] = wins.mean() * 100
+    
+    total_profit = pnl[wins].sum()
+    total_loss = -pnl[~wins].sum()
+    
+    if total_loss > 0:
+        metrics['profit_factor'] = total_profit / total_loss
+    
+    # Sharpe ratio (simplified) on per-trade returns relative to position size
+    returns = pnl[size > 0] / size[size > 0]
+    if returns.size > 0:
+        std = returns.std()
+        if std != 0:
+            metrics['sharpe_ratio'] = np.sqrt(252) * (returns.mean() / std)
+    
+    return metrics
+
 
 class ContinuousOptimizer:
     """Continuous optimization and monitoring system."""
@@ -19,39 +207,66 @@ class ContinuousOptimizer:
         self.ml_predictor = MLPredictor(use_ml=Config.USE_ML_MODELS)
         
         # Monitoring state
-        self.correlation_matrix = {}
-        self.false_signal_log = []
+        self.correlation_matrix = None
+        self.correlation_pairs = []
+        self.false_signal_log = deque(maxlen=1024)
         self.last_retrain_time = datetime.now()
         
-        # Schedule tasks
-        self._schedule_tasks()
+        # CPU-heavy optimizer work runs here, off the trading process' GIL. The
+        # worker is only started on first submit and keeps its history cache warm;
+        # it is spawned, not forked, since the bot is multi-threaded by then
+        self.process_pool = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context('spawn')
+        )
     
-    def _schedule_tasks(self):
-        """Schedule optimization tasks."""
-        # Retrain model every 24 hours
-        schedule.every(24).hours.do(self.retrain_models)
-        
-        # Monitor correlations every hour
-        schedule.every(1).hour.do(self.monitor_correlations)
-        
-        # Analyze false signals every 6 hours
-        schedule.every(6).hours.do(self.analyze_false_signals)
-        
-        # Daily performance report
-        schedule.every().day.at("00:00").do(self.generate_daily_report)
-        
-        self.logger.info("Optimization tasks scheduled")
+    async def _run_periodic(self, interval_s: float, job):
+        """Run a blocking job every interval_s seconds without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval_s)
+            try:
+                await loop.run_in_executor(None, job)
+            except Exception as e:
+                self.logger.error(f"Error in optimization job {job.__name__}: {e}")
     
-    def start(self):
-        """Start optimization scheduler."""
-        self.logger.info("Starting continuous optimization")
-        
+    async def _run_daily(self, job):
+        """Run a blocking job every day at 00:00 local time."""
+        loop = asyncio.get_running_loop()
         while True:
+            now = datetime.now()
+            next_midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+            await asyncio.sleep((next_midnight - now).total_seconds())
             try:
-                schedule.run_pending()
-                time.sleep(60)  # Check every minute
+                await loop.run_in_executor(None, job)
             except Exception as e:
-                self.logger.error(f"Error in optimization loop: {e}")
+                self.logger.error(f"Error in optimization job {job.__name__}: {e}")
+    
+    async def start_async(self):
+        """Run optimization tasks as coroutines on the current event loop."""
+        self.logger.info("Starting continuous optimization")
+        
+        try:
+            await asyncio.gather(
+                # Retrain model every 24 hours
+                self._run_periodic(24 * 3600, self.retrain_models),
+                # Monitor correlations every hour
+                self._run_periodic(3600, self.monitor_correlations),
+                # Analyze false signals every 6 hours
+                self._run_periodic(6 * 3600, self.analyze_false_signals),
+                # Daily performance report
+                self._run_daily(self.generate_daily_report)
+            )
+        finally:
+            self.stop()
+    
+    def start(self):
+        """Start optimization tasks on a dedicated event loop (blocking)."""
+        asyncio.run(self.start_async())
+    
+    def stop(self):
+        """Shut down the worker process."""
+        self.process_pool.shutdown(wait=False, cancel_futures=True)
+        self.logger.info("Continuous optimization stopped")
     
     def retrain_models(self):
         """Retrain ML models with latest data."""
@@ -63,8 +278,8 @@ class ContinuousOptimizer:
                 df = self.bot.exchange.get_ohlcv(limit=1000)
                 
                 if df is not None and not df.empty:
-                    # Prepare training data
-                    X, y = self._prepare_training_data(df)
+                    # Prepare training data in the worker process
+                    X, y = self.process_pool.submit(prepare_training_data, df).result()
                     
                     # Retrain model
                     if self.ml_predictor:
@@ -82,26 +297,35 @@ class ContinuousOptimizer:
         """Monitor correlation changes between trading pairs."""
         try:
             pairs = ['BTC/USDT', 'ETH/USDT', 'BNB/USDT']  # Example pairs
-            correlations = {}
+            labels = []
+            series = []
             
             for pair in pairs:
                 if self.bot and self.bot.exchange:
                     # Get data for each pair
                     df = self.bot.exchange.get_ohlcv(symbol=pair, limit=100)
-                    if df is not None:
-                        correlations[pair] = df['close'].pct_change()
+                    if df is not None and len(df) > 2:
+                        labels.append(pair)
+                        series.append(df['close'].to_numpy(dtype=np.float64))
             
             # Calculate correlation matrix
-            if correlations:
-                corr_df = pd.DataFrame(correlations)
-                new_corr_matrix = corr_df.corr()
+            if series:
+                # Align on the most recent common window and take all returns in one pass
+                min_len = min(len(c) for c in series)
+                closes = np.stack([c[-min_len:] for c in series])
+                returns = np.diff(closes, axis=1) / closes[:, :-1]
+                new_corr_matrix = np.corrcoef(returns)
                 
                 # Check for significant changes
-                if self.correlation_matrix:
-                    changes = new_corr_matrix - self.correlation_matrix
-                    significant_changes = changes[abs(changes) > 0.2]
+                if self.correlation_matrix is not None and self.correlation_pairs == labels:
+                    changes = np.abs(new_corr_matrix - self.correlation_matrix)
+                    rows, cols = np.where(np.triu(changes > 0.2, k=1))
                     
-                    if not significant_changes.empty:
+                    if rows.size:
+                        significant_changes = {
+                            f"{labels[i]}-{labels[j]}": float(new_corr_matrix[i, j] - self.correlation_matrix[i, j])
+                            for i, j in zip(rows, cols)
+                        }
                         self.logger.warning(f"Significant correlation changes detected: {significant_changes}")
                         
                         # Notify about changes
@@ -110,6 +334,7 @@ class ContinuousOptimizer:
                             self.bot.notifier.send_message(message)
                 
                 self.correlation_matrix = new_corr_matrix
+                self.correlation_pairs = labels
                 
         except Exception as e:
             self.logger.error(f"Error monitoring correlations: {e}")
@@ -120,38 +345,18 @@ class ContinuousOptimizer:
             if not self.bot or not self.bot.trade_logger:
                 return
             
-            # Read trading history
-            df = pd.read_csv('trading_history.csv')
-            if df.empty:
-                return
-            
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            df['hour'] = df['timestamp'].dt.hour
-            
-            # Identify losing trades
-            losing_trades = df[(df['action'] == 'close') & (df['pnl'] < 0)]
+            # Aggregate losses per hour in the worker process
+            low_liquidity_hours, loss_counts, avg_losses = self.process_pool.submit(
+                hourly_loss_stats, TRADING_HISTORY_FILE
+            ).result()
             
-            # Analyze by hour (liquidity proxy)
-            hourly_stats = losing_trades.groupby('hour').agg({
-                'pnl': ['count', 'sum', 'mean']
-            })
-            
-            # Identify problematic hours (low liquidity)
-            low_liquidity_hours = []
-            for hour in range(24):
-                if hour not in range(*Config.HIGH_LIQUIDITY_HOURS):
-                    if hour in hourly_stats.index:
-                        loss_count = hourly_stats.loc[hour, ('pnl', 'count')]
-                        avg_loss = hourly_stats.loc[hour, ('pnl', 'mean')]
-                        
-                        if loss_count > 3 and avg_loss < -10:  # Threshold
-                            low_liquidity_hours.append(hour)
-                            self.false_signal_log.append({
-                                'hour': hour,
-                                'loss_count': loss_count,
-                                'avg_loss': avg_loss,
-                                'timestamp': datetime.now()
-                            })
+            for hour in low_liquidity_hours:
+                self.false_signal_log.append({
+                    'hour': hour,
+                    'loss_count': int(loss_counts[hour]),
+                    'avg_loss': float(avg_losses[hour]),
+                    'timestamp': datetime.now()
+                })
             
             if low_liquidity_hours:
                 self.logger.warning(f"High false signal rate during hours: {low_liquidity_hours}")
@@ -163,41 +368,6 @@ class ContinuousOptimizer:
         except Exception as e:
             self.logger.error(f"Error analyzing false signals: {e}")
     
-    def _prepare_training_data(self, df: pd.DataFrame) -> tuple:
-        """Prepare data for model training."""
-        # Calculate features
-        features = []
-        labels = []
-        
-        # Add technical indicators
-        df['rsi'] = self._calculate_rsi(df['close'])
-        df['volume_ratio'] = df['volume'] / df['volume'].rolling(20).mean()
-        df['price_change'] = df['close'].pct_change()
-        
-        # Create labels (future price direction)
-        df['future_return'] = df['close'].shift(-5) / df['close'] - 1
-        df['label'] = np.where(df['future_return'] > 0.001, 1, 
-                              np.where(df['future_return'] < -0.001, -1, 0))
-        
-        # Prepare feature matrix
-        feature_cols = ['rsi', 'volume_ratio', 'price_change']
-        df = df.dropna()
-        
-        X = df[feature_cols].values
-        y = df['label'].values
-        
-        return X, y
-    
-    def _calculate_rsi(self, prices: pd.Series, period: int = 14) -> pd.Series:
-        """Calculate RSI indicator."""
-        delta = prices.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        return rsi
-    
     def generate_daily_report(self):
         """Generate comprehensive daily performance report."""
         try:
@@ -210,14 +380,15 @@ class ContinuousOptimizer:
                 'risk_metrics': self._calculate_risk_metrics(),
                 'optimization_status': {
                     'last_retrain': self.last_retrain_time.isoformat(),
-                    'correlation_changes': len(self.correlation_matrix) > 0,
+                    'correlation_changes': self.correlation_matrix is not None,
                     'false_signals_detected': len(self.false_signal_log)
                 }
             }
             
             # Save report
             report_file = f"optimization_report_{report['date']}.json"
-            pd.DataFrame([report]).to_json(report_file, orient='records', indent=2)
+            with open(report_file, 'w') as file:
+                json.dump(report, file, indent=2, default=str)
             
             # Send summary via Telegram
             if self.bot.notifier:
@@ -267,28 +438,12 @@ False Signals: {len(self.false_signal_log)}
             if self.bot and self.bot.risk_manager:
                 risk_metrics = self.bot.risk_manager.get_risk_metrics()
                 
-                # Read trading history for additional metrics
-                df = pd.read_csv('trading_history.csv')
-                if not df.empty:
-                    closed_trades = df[df['action'] == 'close']
-                    
-                    if not closed_trades.empty:
-                        winning_trades = closed_trades[closed_trades['pnl'] > 0]
-                        metrics['win_rate'] = len(winning_trades) / len(closed_trades) * 100
-                        
-                        total_profit = closed_trades[closed_trades['pnl'] > 0]['pnl'].sum()
-                        total_loss = abs(closed_trades[closed_trades['pnl'] < 0]['pnl'].sum())
-                        
-                        if total_loss > 0:
-                            metrics['profit_factor'] = total_profit / total_loss
-                        
-                        # Sharpe ratio (simplified)
-                        returns = closed_trades['pnl'].pct_change().dropna()
-                        if len(returns) > 0 and returns.std() != 0:
-                            metrics['sharpe_ratio'] = np.sqrt(252) * (returns.mean() / returns.std())
-                        
-                        metrics.update(risk_metrics)
-                        
+                # Read trading history for additional metrics in the worker process
+                history_metrics = self.process_pool.submit(trade_history_metrics, TRADING_HISTORY_FILE).result()
+                if history_metrics:
+                    metrics.update(history_metrics)
+                    metrics.update(risk_metrics)
+                
         except Exception as e:
             self.logger.error(f"Error calculating risk metrics: {e}")
         
@@ -374,11 +529,8 @@ class EnhancedTradingBot:
         
         await self.websocket_client.initialize()
         
-        # Start optimization scheduler in background
-        import threading
-        optimizer_thread = threading.Thread(target=self.optimizer.start)
-        optimizer_thread.daemon = True
-        optimizer_thread.start()
+        # Start optimization tasks on the same event loop
+        self.optimizer_task = asyncio.create_task(self.optimizer.start_async())
         
         # Connect to WebSocket and start trading
         await self.websocket_client.connect()
@@ -1,5 +1,8 @@
 # src/risk_manager.py
 import time
+import numpy as np
+from collections import deque
+from itertools import islice
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from config.settings import Config
@@ -9,30 +12,33 @@ class RiskManager:
     """Advanced risk management with penalties and exclusions."""
     
     def __init__(self):
-        self.trade_history = []
+        self.trade_history = deque(maxlen=Config.TRADE_HISTORY_MAX)
+        self.total_trades = 0
         self.penalty_multiplier = 1.0
-        self.excluded_strategies = {}  # strategy -> exclusion_end_time
+        self._inv_penalty = 1.0  # 1 / penalty_multiplier
+        self._max_size = min(Config.MAX_POSITION_SIZE, Config.TRADE_AMOUNT_USDT)
+        self.excluded_strategies = {}  # strategy -> exclusion end (time.monotonic_ns())
         self.last_big_loss_time = None
     
     def calculate_position_size(self, balance: float, current_price: float, 
                               atr: float) -> float:
         """Calculate position size based on ATR and account risk."""
-        # Podstawowy rozmiar pozycji
-        risk_amount = balance * Config.RISK_PER_TRADE
-        
-        # Oblicz stop loss distance na podstawie ATR
-        stop_distance = atr * 2  # 2× ATR dla stop loss
-        
-        # Oblicz wielkość pozycji
-        position_size_btc = risk_amount / stop_distance
-        position_size_usd = position_size_btc * current_price
-        
-        # Aplikuj mnożnik kary
-        position_size_usd *= (1 / self.penalty_multiplier)
+        # Rozmiar pozycji: ryzyko / (2× ATR dla stop loss), w USD, z mnożnikiem kary
+        position_size_usd = (balance * Config.RISK_PER_TRADE * 0.5 / atr) * current_price * self._inv_penalty
         
         # Ogranicz do maksymalnego rozmiaru
-        max_size = min(Config.MAX_POSITION_SIZE, Config.TRADE_AMOUNT_USDT)
-        return min(position_size_usd, max_size)
+        return min(position_size_usd, self._max_size)
+    
+    def calculate_position_size_batch(self, balances: np.ndarray, current_prices: np.ndarray, 
+                                      atrs: np.ndarray) -> np.ndarray:
+        """Calculate position sizes for many balance/price/ATR triples at once."""
+        balances = np.asarray(balances, dtype=np.float64)
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        atrs = np.asarray(atrs, dtype=np.float64)
+        
+        # Same formula and cap as calculate_position_size, element-wise
+        position_size_usd = (balances * Config.RISK_PER_TRADE * 0.5 / atrs) * current_prices * self._inv_penalty
+        return np.minimum(position_size_usd, self._max_size)
     
     def calculate_stop_loss(self, entry_price: float, side: str, 
                            spread: float, atr: float) -> float:
@@ -51,6 +57,7 @@ class RiskManager:
     def record_trade(self, trade: Dict):
         """Record trade and apply penalties if necessary."""
         self.trade_history.append(trade)
+        self.total_trades += 1
         
         if trade.get('action') == 'close' and 'pnl' in trade:
             # Oblicz procentową stratę/zysk
@@ -68,34 +75,38 @@ class RiskManager:
     def _apply_penalty(self):
         """Apply penalty multiplier for small losses."""
         self.penalty_multiplier = Config.PENALTY_MULTIPLIER
+        self._inv_penalty = 1.0 / self.penalty_multiplier
         print(f"Penalty applied: position size reduced by {self.penalty_multiplier}x")
     
     def _apply_strategy_exclusion(self, strategy: str):
         """Exclude strategy after big loss."""
+        self.excluded_strategies[strategy] = time.monotonic_ns() + int(Config.EXCLUSION_PERIOD * 1_000_000_000)
         exclusion_end = datetime.now() + timedelta(seconds=Config.EXCLUSION_PERIOD)
-        self.excluded_strategies[strategy] = exclusion_end
         print(f"Strategy '{strategy}' excluded until {exclusion_end}")
     
     def is_strategy_allowed(self, strategy: str) -> bool:
         """Check if strategy is currently allowed."""
-        if strategy in self.excluded_strategies:
-            if datetime.now() < self.excluded_strategies[strategy]:
-                return False
-            else:
-                # Exclusion period ended
-                del self.excluded_strategies[strategy]
+        exclusion_end = self.excluded_strategies.get(strategy)
+        if exclusion_end is None:
+            return True
+        if time.monotonic_ns() < exclusion_end:
+            return False
+        
+        # Exclusion period ended
+        del self.excluded_strategies[strategy]
         return True
     
     def reset_penalties(self):
         """Reset penalties after successful trades."""
         # Sprawdź ostatnie 3 transakcje
-        recent_trades = self.trade_history[-3:]
+        recent_trades = list(islice(reversed(self.trade_history), 3))
         closed_trades = [t for t in recent_trades if t.get('action') == 'close']
         
         if len(closed_trades) >= 3:
             # Jeśli wszystkie są zyskowne, zresetuj kary
             if all(t.get('pnl', 0) > 0 for t in closed_trades):
                 self.penalty_multiplier = 1.0
+                self._inv_penalty = 1.0
                 print("Penalties reset after 3 profitable trades")
     
     def check_daily_loss_limit(self, daily_pnl: float) -> bool:
@@ -108,5 +119,5 @@ class RiskManager:
             'penalty_multiplier': self.penalty_multiplier,
             'excluded_strategies': list(self.excluded_strategies.keys()),
             'last_big_loss': self.last_big_loss_time.isoformat() if self.last_big_loss_time else None,
-            'total_trades': len(self.trade_history)
+            'total_trades': self.total_trades
         }
\ No newline at end of file
@@ -2,7 +2,6 @@
 import logging
 import threading
 import time
-from datetime import datetime, timedelta
 from typing import Dict, List
 from config.settings import Config
 from src.notifier import TelegramNotifier
@@ -11,6 +10,12 @@ from src.notifier import TelegramNotifier
 class RiskMonitor:
     """Real-time risk monitoring and alerting system."""
     
+    # Bits of _sent_flags, one per alert already sent today
+    WARN_SENT = 1
+    CRIT_SENT = 2
+    LEV_SENT = 4
+    CONS_SENT = 8
+    
     def __init__(self, risk_manager, positions_tracker):
         self.logger = logging.getLogger(__name__)
         self.risk_manager = risk_manager
@@ -18,20 +23,42 @@ class RiskMonitor:
         self.notifier = TelegramNotifier()
         
         # Alert thresholds
-        self.alerts = {
-            'daily_loss_warning': {'threshold': 0.5, 'sent': False},  # 50% of max daily loss
-            'daily_loss_critical': {'threshold': 0.8, 'sent': False}, # 80% of max daily loss
-            'leverage_high': {'threshold': 30, 'sent': False},       # High leverage warning
-            'consecutive_losses': {'threshold': 2, 'sent': False}     # Near max consecutive losses
+        self.alert_thresholds = {
+            'daily_loss_warning': 0.5,   # 50% of max daily loss
+            'daily_loss_critical': 0.8,  # 80% of max daily loss
+            'leverage_high': 30,         # High leverage warning
+            'consecutive_losses': 2      # Near max consecutive losses
         }
         
-        # Monitoring thread
+        # Absolute thresholds precomputed for the per-tick checks
+        self._warn_abs = Config.MAX_DAILY_LOSS_PERCENT * self.alert_thresholds['daily_loss_warning']
+        self._crit_abs = Config.MAX_DAILY_LOSS_PERCENT * self.alert_thresholds['daily_loss_critical']
+        self._lev_thr = self.alert_thresholds['leverage_high']
+        self._cons_thr = self.alert_thresholds['consecutive_losses']
+        
+        # Sent alerts as a bitmask; only the monitor thread writes it and a
+        # single int store is atomic, so readers need no lock
+        self._sent_flags = 0
+        self._last_reset_day = int(time.time() // 86400)
+        
+        # Alerts raised during one check, sent together as one message
+        self._pending_alerts = []
+        
+        # Monitoring thread; one condition guards both shutdown and wake-ups
         self.monitoring = True
         self.monitor_thread = None
+        self._cv = threading.Condition()
+        self._wake_pending = False
+        
+        # Re-check immediately whenever the risk manager records a trade
+        if hasattr(risk_manager, 'trade_listeners'):
+            risk_manager.trade_listeners.append(self.trigger_check)
     
     def start_monitoring(self):
         """Start the monitoring thread."""
-        self.monitoring = True
+        with self._cv:
+            self.monitoring = True
+            self._wake_pending = False
         self.monitor_thread = threading.Thread(target=self._monitor_loop)
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
@@ -39,19 +66,36 @@ class RiskMonitor:
     
     def stop_monitoring(self):
         """Stop the monitoring thread."""
-        self.monitoring = False
+        with self._cv:
+            self.monitoring = False
+            self._cv.notify_all()
         if self.monitor_thread:
             self.monitor_thread.join()
         self.logger.info("Risk monitoring stopped")
     
+    def trigger_check(self):
+        """Wake the monitoring loop for an immediate risk check."""
+        with self._cv:
+            self._wake_pending = True
+            self._cv.notify_all()
+    
     def _monitor_loop(self):
         """Main monitoring loop."""
-        while self.monitoring:
+        while True:
+            with self._cv:
+                if not self.monitoring:
+                    break
+            
             try:
                 self._check_risk_metrics()
-                time.sleep(30)  # Check every 30 seconds
             except Exception as e:
                 self.logger.error(f"Error in risk monitoring: {e}")
+            
+            # Check every 30 seconds, or earlier when triggered/stopped;
+            # triggers arriving during a check coalesce into one re-check
+            with self._cv:
+                self._cv.wait_for(lambda: self._wake_pending or not self.monitoring, timeout=30)
+                self._wake_pending = False
     
     def _check_risk_metrics(self):
         """Check all risk metrics and send alerts if needed."""
@@ -59,43 +103,45 @@ class RiskMonitor:
         
         # Check daily loss
         daily_loss_percent = abs(risk_report['daily_pnl_percent'])
-        max_loss = Config.MAX_DAILY_LOSS_PERCENT
         
         # Warning at 50% of max daily loss
-        if daily_loss_percent >= max_loss * self.alerts['daily_loss_warning']['threshold']:
-            if not self.alerts['daily_loss_warning']['sent']:
+        if daily_loss_percent >= self._warn_abs:
+            if not self._sent_flags & self.WARN_SENT:
                 self._send_alert(
                     "⚠️ Daily Loss Warning",
                     f"Daily loss reached {daily_loss_percent:.1f}% "
-                    f"(warning at {max_loss * 0.5:.1f}%)"
+                    f"(warning at {self._warn_abs:.1f}%)"
                 )
-                self.alerts['daily_loss_warning']['sent'] = True
+                self._sent_flags |= self.WARN_SENT
         
         # Critical at 80% of max daily loss
-        if daily_loss_percent >= max_loss * self.alerts['daily_loss_critical']['threshold']:
-            if not self.alerts['daily_loss_critical']['sent']:
+        if daily_loss_percent >= self._crit_abs:
+            if not self._sent_flags & self.CRIT_SENT:
                 self._send_alert(
                     "🚨 Daily Loss Critical",
                     f"Daily loss reached {daily_loss_percent:.1f}% "
-                    f"(limit at {max_loss:.1f}%)",
+                    f"(limit at {Config.MAX_DAILY_LOSS_PERCENT:.1f}%)",
                     priority='high'
                 )
-                self.alerts['daily_loss_critical']['sent'] = True
+                self._sent_flags |= self.CRIT_SENT
         
         # Check consecutive losses
         consecutive_losses = risk_report['consecutive_losses']
-        if consecutive_losses >= self.alerts['consecutive_losses']['threshold']:
-            if not self.alerts['consecutive_losses']['sent']:
+        if consecutive_losses >= self._cons_thr:
+            if not self._sent_flags & self.CONS_SENT:
                 self._send_alert(
                     "⚠️ Consecutive Losses Warning",
                     f"{consecutive_losses} consecutive losses "
                     f"(system pauses at {Config.MAX_CONSECUTIVE_LOSSES})"
                 )
-                self.alerts['consecutive_losses']['sent'] = True
+                self._sent_flags |= self.CONS_SENT
         
         # Check high leverage usage
         self._check_leverage_usage()
         
+        # Send everything raised by this check in one notification
+        self._flush_alerts()
+        
         # Reset alerts at new day
         self._reset_daily_alerts()
     
@@ -106,39 +152,49 @@ class RiskMonitor:
         for symbol, positions in self.positions_tracker.items():
             for position in positions:
                 leverage = position.get('leverage', Config.BASE_LEVERAGE)
-                if leverage >= self.alerts['leverage_high']['threshold']:
+                if leverage >= self._lev_thr:
                     high_leverage_positions.append({
                         'symbol': symbol,
                         'leverage': leverage,
                         'size': position.get('size_usd', 0)
                     })
         
-        if high_leverage_positions and not self.alerts['leverage_high']['sent']:
+        if high_leverage_positions and not self._sent_flags & self.LEV_SENT:
             message = "High leverage positions detected:\n"
             for pos in high_leverage_positions:
                 message += f"• {pos['symbol']}: {pos['leverage']}x (${pos['size']:.2f})\n"
             
             self._send_alert("⚠️ High Leverage Warning", message)
-            self.alerts['leverage_high']['sent'] = True
+            self._sent_flags |= self.LEV_SENT
     
     def _send_alert(self, title: str, message: str, priority: str = 'normal'):
-        """Send alert notification."""
+        """Queue alert notification for the next flush."""
         full_message = f"<b>{title}</b>\n\n{message}"
         
         if priority == 'high':
             # Add urgency indicators for high priority
             full_message = "🚨🚨🚨\n" + full_message + "\n🚨🚨🚨"
         
-        self.notifier.send_message(full_message)
+        self._pending_alerts.append(full_message)
         self.logger.warning(f"{title}: {message}")
     
+    def _flush_alerts(self):
+        """Send all queued alerts as a single Telegram message."""
+        if not self._pending_alerts:
+            return
+        
+        message = "\n\n---\n\n".join(self._pending_alerts)
+        self._pending_alerts = []
+        self.notifier.send_message(message)
+    
     def _reset_daily_alerts(self):
         """Reset daily alerts at the start of a new day."""
-        current_hour = datetime.now().hour
-        if current_hour == 0 and any(alert['sent'] for alert in self.alerts.values()):
-            for alert in self.alerts.values():
-                alert['sent'] = False
-            self.logger.info("Daily alerts reset")
+        today = int(time.time() // 86400)
+        if today != self._last_reset_day:
+            self._last_reset_day = today
+            if self._sent_flags:
+                self._sent_flags = 0
+                self.logger.info("Daily alerts reset")
     
     def get_risk_summary(self) -> Dict:
         """Get current risk summary."""
@@ -150,5 +206,5 @@ class RiskMonitor:
             'consecutive_losses': risk_report['consecutive_losses'],
             'system_status': 'PAUSED' if risk_report['system_paused'] else 'ACTIVE',
             'leverage_multiplier': risk_report['leverage_multiplier'],
-            'alerts_triggered': sum(1 for alert in self.alerts.values() if alert['sent'])
+            'alerts_triggered': bin(self._sent_flags).count('1')
         }
\ No newline at end of file
@@ -1,17 +1,59 @@
 # src/security_filters.py
 import numpy as np
-import pandas as pd
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+from datetime import datetime
 import logging
+import time
+from collections import Counter, deque
+from src._indicators_njit import _scan_ohlcv_loop
+
+
+def _get_arrays(market_data: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (close, volume) float64 arrays, cached on the market_data dict."""
+    close = market_data.get('_close_np')
+    if close is None:
+        df = market_data['ohlcv']
+        close = market_data['_close_np'] = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+        market_data['_volume_np'] = np.ascontiguousarray(df['volume'].to_numpy(dtype=np.float64))
+    return close, market_data['_volume_np']
+
+
+def _is_regular(prices: np.ndarray) -> bool:
+    """True when price levels are spaced too regularly (std below 10% of mean gap)."""
+    diffs = np.diff(prices)
+    if diffs.size <= 3:
+        return False
+    
+    mean = diffs.mean()
+    if not mean > 0:
+        return False
+    
+    # std < 0.1 * mean, via var = E[d^2] - mean^2 in one fused pass
+    var = np.dot(diffs, diffs) / diffs.size - mean * mean
+    return bool(var < (mean * 0.1) ** 2)
 
 
 class SecurityFilters:
     """Security filters for market anomalies and manipulation detection."""
     
+    # Severity per anomaly type; the most severe detected type wins
+    SEVERITY_RANK = {'normal': 0, 'high': 1, 'critical': 2}
+    SEVERITY_BY_RANK = ('normal', 'high', 'critical')
+    TYPE_SEVERITY = {
+        'volume_spike': 'high',
+        'price_manipulation': 'critical',
+        'orderbook_manipulation': 'high'
+    }
+    RECOMMENDATION = ('proceed', 'require_confirmation', 'block_signal')
+    
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.anomaly_log = []
+        self.anomaly_log = deque(maxlen=1000)  # Keep only last 1000 entries
+        self._stats = {
+            'by_type': Counter(),
+            'by_severity': Counter(),
+            'timestamps': deque(maxlen=1000)  # time.monotonic() per log entry
+        }
         self.manipulation_patterns = []
         
         # Thresholds for anomaly detection
@@ -33,33 +75,29 @@ class SecurityFilters:
             if df is None or df.empty:
                 return anomalies
             
-            # Check volume anomaly
-            volume_anomaly = self._check_volume_anomaly(df)
-            if volume_anomaly['detected']:
-                anomalies['is_anomaly'] = True
-                anomalies['anomaly_type'].append('volume_spike')
-                anomalies['severity'] = 'high'
+            types = []
+            
+            # Scan OHLCV once for volume and price anomalies
+            flags = self._scan_ohlcv(market_data)
+            if flags['volume_spike']:
+                types.append('volume_spike')
             
             # Check price manipulation
-            price_anomaly = self._check_price_manipulation(df)
-            if price_anomaly['detected']:
-                anomalies['is_anomaly'] = True
-                anomalies['anomaly_type'].append('price_manipulation')
-                anomalies['severity'] = 'critical'
+            if flags['pump_and_dump'] or flags['wash_trading']:
+                types.append('price_manipulation')
             
             # Check order book manipulation
             if market_data.get('order_book'):
                 orderbook_anomaly = self._check_orderbook_manipulation(market_data['order_book'])
                 if orderbook_anomaly['detected']:
-                    anomalies['is_anomaly'] = True
-                    anomalies['anomaly_type'].append('orderbook_manipulation')
-                    anomalies['severity'] = 'high'
+                    types.append('orderbook_manipulation')
             
-            # Set recommendation based on severity
-            if anomalies['severity'] == 'critical':
-                anomalies['recommendation'] = 'block_signal'
-            elif anomalies['severity'] == 'high':
-                anomalies['recommendation'] = 'require_confirmation'
+            # Severity and recommendation from the most severe detected type
+            rank = max((self.SEVERITY_RANK[self.TYPE_SEVERITY[t]] for t in types), default=0)
+            anomalies['is_anomaly'] = bool(types)
+            anomalies['anomaly_type'] = types
+            anomalies['severity'] = self.SEVERITY_BY_RANK[rank]
+            anomalies['recommendation'] = self.RECOMMENDATION[rank]
             
             # Log anomaly
             if anomalies['is_anomaly']:
@@ -70,165 +108,73 @@ class SecurityFilters:
         
         return anomalies
     
-    def _check_volume_anomaly(self, df: pd.DataFrame) -> Dict:
-        """Check for abnormal volume spikes."""
-        try:
-            # Calculate average volume
-            avg_volume = df['volume'].rolling(window=20).mean()
-            current_volume = df['volume'].iloc[-1]
-            
-            if avg_volume.iloc[-1] > 0:
-                volume_ratio = current_volume / avg_volume.iloc[-1]
-                
-                if volume_ratio > self.VOLUME_SPIKE_MULTIPLIER:
-                    return {
-                        'detected': True,
-                        'ratio': volume_ratio,
-                        'message': f"Volume spike detected: {volume_ratio:.1f}x average"
-                    }
-            
-            return {'detected': False}
-            
-        except Exception as e:
-            self.logger.error(f"Error checking volume anomaly: {e}")
-            return {'detected': False}
-    
-    def _check_price_manipulation(self, df: pd.DataFrame) -> Dict:
-        """Check for potential price manipulation patterns."""
-        try:
-            # Check for pump and dump patterns
-            price_changes = df['close'].pct_change()
-            
-            # Rapid price increase followed by decrease
-            if len(df) >= 10:
-                recent_max = df['close'].iloc[-10:].max()
-                recent_min = df['close'].iloc[-10:].min()
-                current_price = df['close'].iloc[-1]
-                
-                # Check for pump (rapid increase)
-                pump_ratio = (recent_max - recent_min) / recent_min
-                
-                # Check for dump (rapid decrease after pump)
-                if recent_max != current_price:
-                    dump_ratio = (recent_max - current_price) / recent_max
-                    
-                    if pump_ratio > self.PRICE_SPIKE_THRESHOLD and dump_ratio > self.PRICE_SPIKE_THRESHOLD:
-                        return {
-                            'detected': True,
-                            'pattern': 'pump_and_dump',
-                            'pump_ratio': pump_ratio,
-                            'dump_ratio': dump_ratio,
-                            'message': "Potential pump and dump pattern detected"
-                        }
-            
-            # Check for wash trading patterns (artificial volume)
-            if self._detect_wash_trading(df):
-                return {
-                    'detected': True,
-                    'pattern': 'wash_trading',
-                    'message': "Potential wash trading detected"
-                }
-            
-            return {'detected': False}
-            
-        except Exception as e:
-            self.logger.error(f"Error checking price manipulation: {e}")
-            return {'detected': False}
+    def _scan_ohlcv(self, market_data: Dict) -> Dict:
+        """Single pass over the OHLCV tail for volume spikes, pump and dump and wash trading."""
+        flags = {'volume_spike': False, 'pump_and_dump': False, 'wash_trading': False}
+        
+        df = market_data['ohlcv']
+        if 'close' not in df.columns or 'volume' not in df.columns:
+            return flags
+        
+        close, volume = _get_arrays(market_data)
+        volume_spike, pump_and_dump, wash_trading = _scan_ohlcv_loop(
+            close, volume, 
+            float(self.VOLUME_SPIKE_MULTIPLIER), 
+            float(self.PRICE_SPIKE_THRESHOLD)
+        )
+        flags['volume_spike'] = bool(volume_spike)
+        flags['pump_and_dump'] = bool(pump_and_dump)
+        flags['wash_trading'] = bool(wash_trading)
+        
+        return flags
     
     def _check_orderbook_manipulation(self, order_book: Dict) -> Dict:
         """Check for order book manipulation (spoofing, layering)."""
-        try:
-            bids = order_book.get('bids', [])
-            asks = order_book.get('asks', [])
-            
-            if not bids or not asks:
-                return {'detected': False}
-            
-            # Check for spoofing (large orders that disappear)
-            large_bid_orders = [float(size) for price, size in bids[:5] if float(size) > 10]
-            large_ask_orders = [float(size) for price, size in asks[:5] if float(size) > 10]
-            
-            # Check for extreme imbalance
-            total_bid_volume = sum(float(size) for _, size in bids[:10])
-            total_ask_volume = sum(float(size) for _, size in asks[:10])
-            
-            if total_bid_volume + total_ask_volume > 0:
-                imbalance = abs(total_bid_volume - total_ask_volume) / (total_bid_volume + total_ask_volume)
-                
-                if imbalance > self.ORDER_BOOK_MANIPULATION_THRESHOLD:
-                    return {
-                        'detected': True,
-                        'pattern': 'extreme_imbalance',
-                        'imbalance': imbalance,
-                        'message': f"Extreme order book imbalance: {imbalance:.2f}"
-                    }
+        bids = order_book.get('bids', [])
+        asks = order_book.get('asks', [])
+        
+        if not bids or not asks:
+            return {'detected': False}
+        
+        # Convert the top 10 levels once: column 0 is price, column 1 size
+        bid_arr = np.asarray(bids[:10], dtype=np.float64)
+        ask_arr = np.asarray(asks[:10], dtype=np.float64)
+        if bid_arr.ndim != 2 or ask_arr.ndim != 2 or bid_arr.shape[1] < 2 or ask_arr.shape[1] < 2:
+            return {'detected': False}
+        
+        bid_sizes = bid_arr[:, 1]
+        ask_sizes = ask_arr[:, 1]
+        
+        # Check for extreme imbalance
+        total_bid_volume = float(bid_sizes.sum())
+        total_ask_volume = float(ask_sizes.sum())
+        
+        if total_bid_volume + total_ask_volume > 0:
+            imbalance = abs(total_bid_volume - total_ask_volume) / (total_bid_volume + total_ask_volume)
             
-            # Check for layering (multiple orders at different price levels)
-            if self._detect_layering(bids, asks):
+            if imbalance > self.ORDER_BOOK_MANIPULATION_THRESHOLD:
                 return {
                     'detected': True,
-                    'pattern': 'layering',
-                    'message': "Potential layering detected in order book"
+                    'pattern': 'extreme_imbalance',
+                    'imbalance': imbalance,
+                    'message': f"Extreme order book imbalance: {imbalance:.2f}"
                 }
-            
-            return {'detected': False}
-            
-        except Exception as e:
-            self.logger.error(f"Error checking order book manipulation: {e}")
-            return {'detected': False}
-    
-    def _detect_wash_trading(self, df: pd.DataFrame) -> bool:
-        """Detect potential wash trading patterns."""
-        try:
-            # Look for repetitive trading patterns
-            if len(df) < 20:
-                return False
-            
-            # Check for similar volume patterns
-            volumes = df['volume'].iloc[-20:]
-            volume_std = volumes.std()
-            volume_mean = volumes.mean()
-            
-            # If volume is too consistent, might be wash trading
-            if volume_mean > 0 and volume_std / volume_mean < 0.1:
-                return True
-            
-            # Check for price patterns with minimal movement
-            price_changes = df['close'].pct_change().iloc[-20:]
-            if price_changes.std() < 0.0001:  # Very low volatility
-                return True
-            
-            return False
-            
-        except Exception:
-            return False
+        
+        # Check for layering (multiple orders at different price levels)
+        if self._detect_layering(bid_arr[:, 0], ask_arr[:, 0]):
+            return {
+                'detected': True,
+                'pattern': 'layering',
+                'message': "Potential layering detected in order book"
+            }
+        
+        return {'detected': False}
     
-    def _detect_layering(self, bids: List, asks: List) -> bool:
+    def _detect_layering(self, bid_prices: np.ndarray, ask_prices: np.ndarray) -> bool:
         """Detect layering patterns in order book."""
-        try:
-            # Check for multiple orders at regular intervals
-            bid_prices = [float(price) for price, _ in bids[:10]]
-            ask_prices = [float(price) for price, _ in asks[:10]]
-            
-            # Check for regular spacing (potential layering)
-            bid_diffs = np.diff(bid_prices)
-            ask_diffs = np.diff(ask_prices)
-            
-            # If differences are too regular, might be layering
-            if len(bid_diffs) > 3:
-                bid_std = np.std(bid_diffs)
-                if bid_std < np.mean(bid_diffs) * 0.1:  # Very regular spacing
-                    return True
-            
-            if len(ask_diffs) > 3:
-                ask_std = np.std(ask_diffs)
-                if ask_std < np.mean(ask_diffs) * 0.1:  # Very regular spacing
-                    return True
-            
-            return False
-            
-        except Exception:
-            return False
+        # Check for multiple orders at regular intervals (potential layering);
+        # the ask side is only checked when the bid side is not regular
+        return _is_regular(bid_prices) or _is_regular(ask_prices)
     
     def _log_anomaly(self, anomaly: Dict, market_data: Dict):
         """Log detected anomaly for analysis."""
@@ -240,11 +186,16 @@ class SecurityFilters:
             'recommendation': anomaly['recommendation']
         }
         
-        self.anomaly_log.append(log_entry)
+        # Drop the entry about to be evicted from the running counts
+        if len(self.anomaly_log) == self.anomaly_log.maxlen:
+            evicted = self.anomaly_log[0]
+            self._stats['by_type'].subtract(evicted['anomaly_type'])
+            self._stats['by_severity'][evicted['severity']] -= 1
         
-        # Keep only last 1000 entries
-        if len(self.anomaly_log) > 1000:
-            self.anomaly_log = self.anomaly_log[-1000:]
+        self.anomaly_log.append(log_entry)
+        self._stats['by_type'].update(anomaly['anomaly_type'])
+        self._stats['by_severity'][anomaly['severity']] += 1
+        self._stats['timestamps'].append(time.monotonic())
     
     def ensure_ethical_trading(self, signal: Dict) -> bool:
         """Ensure the trading signal is ethical and not exploiting insider information."""
@@ -282,13 +233,19 @@ class SecurityFilters:
         if not self.anomaly_log:
             return {'total_anomalies': 0}
         
-        df = pd.DataFrame(self.anomaly_log)
+        # Timestamps are appended in order, so count back from the newest
+        cutoff = time.monotonic() - 86400
+        last_24h = 0
+        for ts in reversed(self._stats['timestamps']):
+            if ts <= cutoff:
+                break
+            last_24h += 1
         
         stats = {
             'total_anomalies': len(self.anomaly_log),
-            'by_type': df['anomaly_type'].value_counts().to_dict(),
-            'by_severity': df['severity'].value_counts().to_dict(),
-            'last_24h': len(df[df['timestamp'] > datetime.now() - timedelta(days=1)])
+            'by_type': {k: v for k, v in self._stats['by_type'].items() if v > 0},
+            'by_severity': {k: v for k, v in self._stats['by_severity'].items() if v > 0},
+            'last_24h': last_24h
         }
         
         return stats
\ No newline at end of file
@@ -1,31 +1,108 @@
 # src/sentiment_analyzer.py
 import requests
-import praw
-import tweepy
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import numpy as np
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import Dict, List
 import logging
+import time
 from config.settings import Config
 
+# Optional faster JSON parser - falls back to the standard library
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
+
+# Simple keyword-based sentiment (would use ML model in production)
+_POS_TWEET = ('bullish', 'moon', 'pump', 'buy', 'long', 'up', 'green', 'ath')
+_NEG_TWEET = ('bearish', 'dump', 'sell', 'short', 'down', 'red', 'crash')
+_POS_NEWS = ('surge', 'rally', 'gain', 'up', 'high', 'bull', 'positive', 'growth')
+_NEG_NEWS = ('crash', 'fall', 'drop', 'down', 'low', 'bear', 'negative', 'decline')
+
+# Fear & Greed classification -> sentiment
+_FNG_SENTIMENT = {
+    'Extreme Fear': 'bearish',
+    'Fear': 'bearish',
+    'Neutral': 'neutral',
+    'Greed': 'bullish',
+    'Extreme Greed': 'bullish'
+}
+
+
+def _label(score: float, threshold: float = 0.1) -> str:
+    """Map a sentiment score to 'bullish' / 'bearish' / 'neutral'."""
+    if score > threshold:
+        return 'bullish'
+    if score < -threshold:
+        return 'bearish'
+    return 'neutral'
+
 
 class EnhancedSentimentAnalyzer:
     """Enhanced sentiment analysis from multiple sources."""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.sentiment_cache = {}
-        self.last_update = {}
+        self.sentiment_cache = {}  # Last successful payload per source
+        self.last_update = {}  # time.monotonic() of the last successful fetch per source
+        
+        # Rate-limit backoff per source: consecutive 429s and monotonic retry time
+        self._rate_limit_hits = {}
+        self._backoff_until = {}
+        
+        # Persistent HTTP session - keep-alive connections are reused between fetches
+        self.http = requests.Session()
+        self.http.headers.update({'User-Agent': 'CryptoSentimentBot/1.0'})
+        adapter = HTTPAdapter(
+            pool_connections=8, 
+            pool_maxsize=16, 
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        self.http.mount('https://', adapter)
         
         # Initialize API clients
         self._initialize_clients()
+        
+        # Sources are fetched concurrently - each one is a blocking network call
+        self._fetchers = {
+            'twitter': self._get_twitter_sentiment,
+            'reddit': self._get_reddit_sentiment,
+            'fear_greed': self._get_fear_greed_index,
+            'news': self._get_news_sentiment
+        }
+        self._pool = ThreadPoolExecutor(max_workers=len(self._fetchers), thread_name_prefix='sentiment')
+        
+        # One multireddit request per listing covers all subreddits (30 hot /
+        # 20 new per subreddit); listings get their own pool so they never
+        # wait behind the source fetches
+        subreddits = ('Bitcoin', 'CryptoCurrency', 'BitcoinMarkets')
+        self._reddit_listings = [
+            ('+'.join(subreddits), 'hot', 30 * len(subreddits)),
+            ('+'.join(subreddits), 'new', 20 * len(subreddits))
+        ]
+        self._reddit_pool = ThreadPoolExecutor(max_workers=len(self._reddit_listings), thread_name_prefix='reddit')
     
     def _initialize_clients(self):
         """Initialize API clients for different platforms."""
+        # tweepy/praw are imported only when their credentials are configured;
+        # until then the rate-limit error tuples match nothing
+        self.twitter_client = None
+        self.reddit_client = None
+        self._twitter_rate_limit_errors = ()
+        self._reddit_rate_limit_errors = ()
+        
         # Twitter/X client
         if Config.TWITTER_BEARER_TOKEN:
             try:
+                import tweepy
                 self.twitter_client = tweepy.Client(bearer_token=Config.TWITTER_BEARER_TOKEN)
+                self._twitter_rate_limit_errors = (tweepy.TooManyRequests,)
                 self.logger.info("Twitter client initialized")
             except Exception as e:
                 self.logger.error(f"Failed to initialize Twitter client: {e}")
@@ -34,11 +111,14 @@ class EnhancedSentimentAnalyzer:
         # Reddit client
         if Config.REDDIT_CLIENT_ID and Config.REDDIT_CLIENT_SECRET:
             try:
+                import praw
+                from prawcore.exceptions import TooManyRequests
                 self.reddit_client = praw.Reddit(
                     client_id=Config.REDDIT_CLIENT_ID,
                     client_secret=Config.REDDIT_CLIENT_SECRET,
                     user_agent='CryptoSentimentBot/1.0'
                 )
+                self._reddit_rate_limit_errors = (TooManyRequests,)
                 self.logger.info("Reddit client initialized")
             except Exception as e:
                 self.logger.error(f"Failed to initialize Reddit client: {e}")
@@ -53,53 +133,64 @@ class EnhancedSentimentAnalyzer:
             'timestamp': datetime.now()
         }
         
-        # Collect from each source
-        if self._should_update('twitter'):
-            twitter_sentiment = self._get_twitter_sentiment()
-            if twitter_sentiment:
-                sentiment_data['sources']['twitter'] = twitter_sentiment
-        
-        if self._should_update('reddit'):
-            reddit_sentiment = self._get_reddit_sentiment()
-            if reddit_sentiment:
-                sentiment_data['sources']['reddit'] = reddit_sentiment
-        
-        if self._should_update('fear_greed'):
-            fear_greed = self._get_fear_greed_index()
-            if fear_greed:
-                sentiment_data['sources']['fear_greed'] = fear_greed
+        # Collect from all due sources at once; wall time is the slowest source
+        futures = {
+            source: self._pool.submit(fetch)
+            for source, fetch in self._fetchers.items()
+            if self._should_update(source)
+        }
         
-        if self._should_update('news'):
-            news_sentiment = self._get_news_sentiment()
-            if news_sentiment:
-                sentiment_data['sources']['news'] = news_sentiment
+        for source in self._fetchers:
+            if source not in futures:
+                # Still within its TTL - serve the cached payload, no HTTP
+                if source in self.sentiment_cache:
+                    sentiment_data['sources'][source] = self.sentiment_cache[source]
+                continue
+            
+            try:
+                result = futures[source].result()
+            except Exception as e:
+                self.logger.error(f"Error getting {source} sentiment: {e}")
+                continue
+            
+            if result:
+                self.sentiment_cache[source] = result
+                sentiment_data['sources'][source] = result
         
-        # Calculate weighted overall sentiment
-        weighted_scores = []
-        for source, data in sentiment_data['sources'].items():
-            if 'score' in data and source in Config.SENTIMENT_WEIGHT:
-                weighted_scores.append(data['score'] * Config.SENTIMENT_WEIGHT[source])
+        # Calculate weighted overall sentiment over the sources actually present
+        weighted = [
+            (data['score'], Config.SENTIMENT_WEIGHT[source])
+            for source, data in sentiment_data['sources'].items()
+            if 'score' in data and source in Config.SENTIMENT_WEIGHT
+        ]
         
-        if weighted_scores:
-            sentiment_data['overall_score'] = sum(weighted_scores) / sum(Config.SENTIMENT_WEIGHT.values())
+        if weighted:
+            scores, weights = np.array(weighted, dtype=np.float64).T
+            sentiment_data['overall_score'] = float(np.average(scores, weights=weights))
             
             # Determine overall sentiment
-            if sentiment_data['overall_score'] > 0.2:
-                sentiment_data['overall_sentiment'] = 'bullish'
-            elif sentiment_data['overall_score'] < -0.2:
-                sentiment_data['overall_sentiment'] = 'bearish'
-            else:
-                sentiment_data['overall_sentiment'] = 'neutral'
+            sentiment_data['overall_sentiment'] = _label(sentiment_data['overall_score'], 0.2)
         
         return sentiment_data
     
     def _should_update(self, source: str) -> bool:
-        """Check if source should be updated based on interval."""
+        """Check if source should be updated based on its cache TTL."""
+        if time.monotonic() < self._backoff_until.get(source, 0):
+            return False
+        
         if source not in self.last_update:
             return True
         
-        time_diff = (datetime.now() - self.last_update[source]).total_seconds()
-        return time_diff > Config.SENTIMENT_UPDATE_INTERVAL
+        ttl = Config.SENTIMENT_CACHE_TTL.get(source, Config.SENTIMENT_UPDATE_INTERVAL)
+        return time.monotonic() - self.last_update[source] > ttl
+    
+    def _on_rate_limited(self, source: str):
+        """Back off exponentially (60s doubling, max 15 min) after a 429 from source."""
+        hits = self._rate_limit_hits.get(source, 0) + 1
+        self._rate_limit_hits[source] = hits
+        delay = min(60 * 2 ** (hits - 1), 900)
+        self._backoff_until[source] = time.monotonic() + delay
+        self.logger.warning(f"{source} rate limit hit - backing off for {delay}s")
     
     def _get_twitter_sentiment(self) -> Dict:
         """Get sentiment from Twitter/X."""
@@ -118,38 +209,25 @@ class EnhancedSentimentAnalyzer:
             if not tweets.data:
                 return None
             
-            # Analyze sentiment
-            positive_count = 0
-            negative_count = 0
-            neutral_count = 0
-            
-            # Simple keyword-based sentiment (would use ML model in production)
-            positive_keywords = ['bullish', 'moon', 'pump', 'buy', 'long', 'up', 'green', 'ath']
-            negative_keywords = ['bearish', 'dump', 'sell', 'short', 'down', 'red', 'crash']
-            
-            for tweet in tweets.data:
-                text = tweet.text.lower()
-                
-                if any(keyword in text for keyword in positive_keywords):
-                    positive_count += 1
-                elif any(keyword in text for keyword in negative_keywords):
-                    negative_count += 1
-                else:
-                    neutral_count += 1
+            # Analyze sentiment: label each tweet +1/-1/0, positive keywords take precedence
+            labels = np.fromiter(
+                (self._tweet_polarity(tweet.text.lower()) for tweet in tweets.data),
+                dtype=np.int8, 
+                count=len(tweets.data)
+            )
+            positive_count = int((labels > 0).sum())
+            negative_count = int((labels < 0).sum())
             
-            total = positive_count + negative_count + neutral_count
+            total = len(labels)
             
             sentiment_score = 0
             if total > 0:
                 sentiment_score = (positive_count - negative_count) / total
             
-            sentiment = 'neutral'
-            if sentiment_score > 0.1:
-                sentiment = 'bullish'
-            elif sentiment_score < -0.1:
-                sentiment = 'bearish'
+            sentiment = _label(sentiment_score)
             
-            self.last_update['twitter'] = datetime.now()
+            self.last_update['twitter'] = time.monotonic()
+            self._rate_limit_hits.pop('twitter', None)
             
             return {
                 'sentiment': sentiment,
@@ -159,75 +237,83 @@ class EnhancedSentimentAnalyzer:
                 'sample_size': total
             }
             
+        except self._twitter_rate_limit_errors:
+            self._on_rate_limited('twitter')
+            return None
         except Exception as e:
             self.logger.error(f"Error getting Twitter sentiment: {e}")
             return None
     
+    @staticmethod
+    def _tweet_polarity(text: str) -> int:
+        """Keyword polarity of a lower-cased tweet: 1 positive, -1 negative, 0 neutral."""
+        if any(keyword in text for keyword in _POS_TWEET):
+            return 1
+        if any(keyword in text for keyword in _NEG_TWEET):
+            return -1
+        return 0
+    
     def _get_reddit_sentiment(self) -> Dict:
         """Get sentiment from Reddit."""
         if not self.reddit_client:
             return None
         
         try:
-            # Get posts from crypto subreddits
-            subreddits = ['Bitcoin', 'CryptoCurrency', 'BitcoinMarkets']
+            # Get hot/new posts from crypto subreddits, both listings in parallel
+            futures = [
+                self._reddit_pool.submit(self._fetch_reddit_listing, subreddit, listing, limit)
+                for subreddit, listing, limit in self._reddit_listings
+            ]
             posts = []
+            for future in futures:
+                posts.extend(future.result())
             
-            for subreddit_name in subreddits:
-                subreddit = self.reddit_client.subreddit(subreddit_name)
-                posts.extend(list(subreddit.hot(limit=30)))
-                posts.extend(list(subreddit.new(limit=20)))
+            # Use Reddit's upvote ratio as sentiment indicator, weighted by engagement
+            rows = np.array(posts, dtype=np.float64).reshape(-1, 2)
+            ratios = rows[:, 0]
+            scores = rows[:, 1]
+            weights = np.minimum(scores / 100, 10)  # Cap weight at 10
             
-            # Analyze sentiment
-            positive_count = 0
-            negative_count = 0
-            total_score = 0
-            
-            for post in posts:
-                # Use Reddit's upvote ratio as sentiment indicator
-                upvote_ratio = post.upvote_ratio
-                score = post.score
-                
-                # Weight by engagement
-                weight = min(score / 100, 10)  # Cap weight at 10
-                
-                if upvote_ratio > 0.7:
-                    positive_count += weight
-                elif upvote_ratio < 0.3:
-                    negative_count += weight
-                
-                total_score += (upvote_ratio - 0.5) * 2 * weight
+            positive_count = weights[ratios > 0.7].sum()
+            negative_count = weights[ratios < 0.3].sum()
+            total_score = ((ratios - 0.5) * 2 * weights).sum()
             
             total_weight = positive_count + negative_count
             
             sentiment_score = 0
             if total_weight > 0:
-                sentiment_score = total_score / total_weight
+                sentiment_score = float(total_score / total_weight)
             
-            sentiment = 'neutral'
-            if sentiment_score > 0.1:
-                sentiment = 'bullish'
-            elif sentiment_score < -0.1:
-                sentiment = 'bearish'
+            sentiment = _label(sentiment_score)
             
-            self.last_update['reddit'] = datetime.now()
+            self.last_update['reddit'] = time.monotonic()
+            self._rate_limit_hits.pop('reddit', None)
             
             return {
                 'sentiment': sentiment,
                 'score': sentiment_score,
                 'sample_size': len(posts),
-                'average_upvote_ratio': sum(post.upvote_ratio for post in posts) / len(posts) if posts else 0
+                'average_upvote_ratio': float(ratios.mean()) if posts else 0
             }
             
+        except self._reddit_rate_limit_errors:
+            self._on_rate_limited('reddit')
+            return None
         except Exception as e:
             self.logger.error(f"Error getting Reddit sentiment: {e}")
             return None
     
+    def _fetch_reddit_listing(self, subreddit_name: str, listing: str, limit: int) -> List:
+        """Fetch one subreddit listing (hot/new) as (upvote_ratio, score) rows."""
+        subreddit = self.reddit_client.subreddit(subreddit_name)
+        # Read each submission's attributes exactly once, while its listing data is loaded
+        return [(post.upvote_ratio, post.score) for post in getattr(subreddit, listing)(limit=limit)]
+    
     def _get_fear_greed_index(self) -> Dict:
         """Get Fear & Greed Index."""
         try:
-            response = requests.get(Config.FEAR_GREED_API, timeout=5)
-            data = response.json()
+            response = self.http.get(Config.FEAR_GREED_API, timeout=5)
+            data = _json_loads(response.content)
             
             if 'data' not in data or not data['data']:
                 return None
@@ -239,17 +325,9 @@ class EnhancedSentimentAnalyzer:
             normalized_score = (current_value - 50) / 50
             
             # Convert classification to sentiment
-            sentiment_map = {
-                'Extreme Fear': 'bearish',
-                'Fear': 'bearish',
-                'Neutral': 'neutral',
-                'Greed': 'bullish',
-                'Extreme Greed': 'bullish'
-            }
+            sentiment = _FNG_SENTIMENT.get(classification, 'neutral')
             
-            sentiment = sentiment_map.get(classification, 'neutral')
-            
-            self.last_update['fear_greed'] = datetime.now()
+            self.last_update['fear_greed'] = time.monotonic()
             
             return {
                 'value': current_value,
@@ -278,8 +356,8 @@ class EnhancedSentimentAnalyzer:
                 'pageSize': 50
             }
             
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
+            response = self.http.get(url, params=params, timeout=10)
+            data = _json_loads(response.content)
             
             if 'articles' not in data:
                 return None
@@ -290,17 +368,13 @@ class EnhancedSentimentAnalyzer:
             positive_count = 0
             negative_count = 0
             
-            positive_keywords = ['surge', 'rally', 'gain', 'up', 'high', 'bull', 'positive', 'growth']
-            negative_keywords = ['crash', 'fall', 'drop', 'down', 'low', 'bear', 'negative', 'decline']
-            
             for article in articles:
-                title = article.get('title', '').lower()
-                description = article.get('description', '').lower()
-                content = title + ' ' + description
+                # Join first, lower-case once (NewsAPI sends null descriptions)
+                content = f"{article.get('title') or ''} {article.get('description') or ''}".lower()
                 
-                if any(keyword in content for keyword in positive_keywords):
+                if any(keyword in content for keyword in _POS_NEWS):
                     positive_count += 1
-                elif any(keyword in content for keyword in negative_keywords):
+                elif any(keyword in content for keyword in _NEG_NEWS):
                     negative_count += 1
             
             total = positive_count + negative_count
@@ -309,13 +383,9 @@ class EnhancedSentimentAnalyzer:
             if total > 0:
                 sentiment_score = (positive_count - negative_count) / total
             
-            sentiment = 'neutral'
-            if sentiment_score > 0.1:
-                sentiment = 'bullish'
-            elif sentiment_score < -0.1:
-                sentiment = 'bearish'
+            sentiment = _label(sentiment_score)
             
-            self.last_update['news'] = datetime.now()
+            self.last_update['news'] = time.monotonic()
             
             return {
                 'sentiment': sentiment,
@@ -1,12 +1,87 @@
 # src/signal_strength.py
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from config.settings import Config
 
 
+# Score per categorical indicator value; unknown values score a neutral 50
+_TREND_SCORES = {
+    'strong_bullish': 100,
+    'bullish': 75,
+    'neutral': 50,
+    'bearish': 25,
+    'strong_bearish': 0
+}
+_DIVERGENCE_SCORES = {
+    'bullish': 90,
+    'bearish': 10,
+    'none': 50
+}
+_BB_POSITION_SCORES = {
+    'below': 80,   # Below lower band - oversold
+    'inside': 50,  # Inside bands - neutral
+    'above': 20    # Above upper band - overbought
+}
+_VOLUME_TREND_SCORES = {
+    'increasing': 70,
+    'decreasing': 30,
+    'neutral': 50
+}
+_PATTERN_SCORES = {
+    'bullish': 80,
+    'bearish': 20,
+    'none': 50
+}
+_SENTIMENT_SCORES = {
+    'bullish': 70,
+    'bearish': 30,
+    'neutral': 50
+}
+
+# Candlestick pattern signals scored by _calculate_pattern_score
+_CANDLE_PATTERNS = ('pattern_engulfing', 'pattern_pin_bar', 'pattern_breakout')
+
+# Directional signal values counted by _get_signal_direction
+_BULLISH = frozenset(('bullish', 'strong_bullish'))
+_BEARISH = frozenset(('bearish', 'strong_bearish'))
+
+
+def _score_table(scores: Dict) -> Tuple[Dict, np.ndarray]:
+    """Value-to-code map and score array for the batch path; the last code scores unknown values."""
+    return {value: i for i, value in enumerate(scores)}, np.array([*scores.values(), 50], dtype=np.float64)
+
+
+_TREND_CODES, _TREND_TABLE = _score_table(_TREND_SCORES)
+_DIVERGENCE_CODES, _DIVERGENCE_TABLE = _score_table(_DIVERGENCE_SCORES)
+_BB_POSITION_CODES, _BB_POSITION_TABLE = _score_table(_BB_POSITION_SCORES)
+_VOLUME_TREND_CODES, _VOLUME_TREND_TABLE = _score_table(_VOLUME_TREND_SCORES)
+_PATTERN_CODES, _PATTERN_TABLE = _score_table(_PATTERN_SCORES)
+
+
+def _code(codes: Dict, value) -> int:
+    """Table code of a categorical signal value, -1 when the signal is absent."""
+    return codes.get(value, len(codes)) if value else -1
+
+
+def _weighted_score(parts) -> np.ndarray:
+    """Category scores from (present mask, score, weight) parts, as in the per-signal scorers."""
+    score = 0.0
+    weights_sum = 0.0
+    for present, part_score, weight in parts:
+        score = score + np.where(present, part_score * weight, 0.0)
+        weights_sum = weights_sum + np.where(present, weight, 0.0)
+    
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(weights_sum > 0, score / weights_sum * 100, 50.0)
+
+
 class SignalStrengthCalculator:
     """Calculate signal strength based on multiple indicators correlation."""
     
+    # Score categories in the order they are weighted into the total
+    CATEGORIES = ('trend', 'momentum', 'volatility', 'volume', 'pattern', 'sentiment')
+    STRENGTH_LEVELS = ('very_weak', 'weak', 'medium', 'strong')
+    
     def __init__(self):
         # Weights for different indicator categories
         self.category_weights = {
@@ -49,6 +124,22 @@ class SignalStrengthCalculator:
             'market_sentiment': 0.6,
             'news_sentiment': 0.4
         }
+        
+        # Weights bound once per category for the scoring paths below
+        w = self.indicator_weights
+        self._category_w = tuple(self.category_weights.get(c, 0) for c in self.CATEGORIES)
+        self._trend_w = (w['ema_crossover'], w['trend_strength'], w['vwap_position'])
+        self._momentum_w = (w['rsi'], w['macd'])
+        self._volatility_w = (w['bb_position'], w['bb_squeeze'])
+        self._volume_w = (w['volume_spike'], w['volume_trend'], w['order_book_imbalance'])
+        self._pattern_w = w['candlestick_pattern']
+        
+        # Strength level thresholds in ascending order, one label per interval
+        self._level_thresholds = np.array([
+            Config.WEAK_SIGNAL_THRESHOLD, 
+            Config.MIN_SIGNAL_STRENGTH, 
+            Config.STRONG_SIGNAL_THRESHOLD
+        ], dtype=np.float64)
     
     def calculate_signal_strength(self, signals: Dict, market_data: Dict, 
                                 sentiment: Dict) -> Dict:
@@ -64,8 +155,7 @@ class SignalStrengthCalculator:
         
         # Calculate weighted total
         total_score = 0
-        for category, score in scores.items():
-            weight = self.category_weights.get(category, 0)
+        for score, weight in zip(scores.values(), self._category_w):
             total_score += score * weight
         
         # Apply sentiment penalty if misaligned
@@ -83,29 +173,132 @@ class SignalStrengthCalculator:
             'sentiment_aligned': sentiment_penalty == 0
         }
     
+    def calculate_signal_strength_batch(self, signals_list: List[Dict], market_list: List[Dict], 
+                                        sentiment_list: List[Dict]) -> List[Dict]:
+        """Calculate signal strength for many signals in one vectorized pass."""
+        if not signals_list:
+            return []
+        
+        # Pack every input into one float64 row per signal: categorical values
+        # as score table codes, numbers with a presence flag
+        rows = []
+        for signals, market_data, sentiment in zip(signals_list, market_list, sentiment_list):
+            get = signals.get
+            ema_crossover = get('ema_crossover')
+            vwap = get('vwap')
+            has_vwap = bool(vwap and market_data.get('ticker'))
+            rsi = get('rsi_14')
+            imbalance_levels = market_data.get('order_book', {}).get('imbalance')
+            has_imbalance = bool(imbalance_levels)
+            
+            rows.append((
+                (ema_crossover != 'none') if ema_crossover else -1,
+                _code(_TREND_CODES, get('trend')),
+                has_vwap,
+                vwap if has_vwap else 1.0,
+                market_data['ticker']['last'] if has_vwap else 0.0,
+                rsi is not None,
+                rsi if rsi is not None else 0.0,
+                _code(_DIVERGENCE_CODES, get('macd_divergence')),
+                _code(_BB_POSITION_CODES, get('bb_position')),
+                bool(get('bb_squeeze')),
+                bool(get('volume_spike')),
+                _code(_VOLUME_TREND_CODES, get('volume_trend')),
+                has_imbalance,
+                imbalance_levels['level_5']['imbalance'] if has_imbalance else 0.0,
+                *(_code(_PATTERN_CODES, get(pattern_type)) for pattern_type in _CANDLE_PATTERNS),
+                self._calculate_sentiment_score(sentiment, signals)
+            ))
+        
+        cols = np.array(rows, dtype=np.float64).T
+        codes = cols[[1, 7, 8, 11, 14, 15, 16]].astype(np.intp)
+        trend_code, macd_code, bb_code, volume_trend_code, *pattern_codes = codes
+        
+        # Trend: EMA crossover, trend strength, VWAP position
+        w_ema, w_trend, w_vwap = self._trend_w
+        vwap_score = 50 + (cols[4] - cols[3]) / cols[3] * 1000
+        vwap_score = np.where(vwap_score < 100, vwap_score, 100.0)
+        vwap_score = np.where(vwap_score > 0, vwap_score, 0.0)
+        trend = _weighted_score((
+            (cols[0] >= 0, np.where(cols[0] > 0, 100.0, 0.0), w_ema),
+            (trend_code >= 0, _TREND_TABLE[trend_code], w_trend),
+            (cols[2] > 0, vwap_score, w_vwap)
+        ))
+        
+        # Momentum: RSI and MACD divergence
+        w_rsi, w_macd = self._momentum_w
+        rsi = cols[6]
+        rsi_score = np.where(rsi < 30, 100.0, np.where(rsi > 70, 0.0, 50 + (50 - rsi) * (50/40)))
+        momentum = _weighted_score((
+            (cols[5] > 0, rsi_score, w_rsi),
+            (macd_code >= 0, _DIVERGENCE_TABLE[macd_code], w_macd)
+        ))
+        
+        # Volatility: Bollinger position and squeeze
+        w_position, w_squeeze = self._volatility_w
+        volatility = _weighted_score((
+            (bb_code >= 0, _BB_POSITION_TABLE[bb_code], w_position),
+            (cols[9] > 0, 80.0, w_squeeze)
+        ))
+        
+        # Volume: spike, trend and order book imbalance
+        w_spike, w_trend, w_imbalance = self._volume_w
+        volume = _weighted_score((
+            (cols[10] > 0, 80.0, w_spike),
+            (volume_trend_code >= 0, _VOLUME_TREND_TABLE[volume_trend_code], w_trend),
+            (cols[12] > 0, (cols[13] + 1) * 50, w_imbalance)
+        ))
+        
+        # Candlestick patterns
+        pattern = _weighted_score(
+            (code >= 0, _PATTERN_TABLE[code], self._pattern_w) for code in pattern_codes
+        )
+        
+        category_scores = (trend, momentum, volatility, volume, pattern, cols[17])
+        total = 0.0
+        for score, weight in zip(category_scores, self._category_w):
+            total = total + score * weight
+        
+        # Sentiment penalty, then clamp to 0-100
+        penalties = [self._calculate_sentiment_penalty(sentiment, signals) 
+                     for signals, sentiment in zip(signals_list, sentiment_list)]
+        total = total - np.array(penalties, dtype=np.float64)
+        total = np.where(total < 100, total, 100.0)
+        total = np.where(total > 0, total, 0.0)
+        
+        # Strength levels in one search: the number of thresholds at or below each total
+        levels = np.searchsorted(self._level_thresholds, total, side='right').tolist()
+        
+        results = []
+        per_signal = zip(total.tolist(), penalties, levels, *(score.tolist() for score in category_scores))
+        for total_score, penalty, level, *scores in per_signal:
+            results.append({
+                'total_score': total_score,
+                'category_scores': dict(zip(self.CATEGORIES, scores)),
+                'sentiment_penalty': penalty,
+                'strength_level': self.STRENGTH_LEVELS[level],
+                'sentiment_aligned': penalty == 0
+            })
+        
+        return results
+    
     def _calculate_trend_score(self, signals: Dict, market_data: Dict) -> float:
         """Calculate trend strength score."""
         score = 0
         weights_sum = 0
+        w_ema, w_trend, w_vwap = self._trend_w
         
         # EMA crossover
         if signals.get('ema_crossover'):
             crossover_score = 100 if signals['ema_crossover'] != 'none' else 0
-            score += crossover_score * self.indicator_weights['ema_crossover']
-            weights_sum += self.indicator_weights['ema_crossover']
+            score += crossover_score * w_ema
+            weights_sum += w_ema
         
         # Trend strength
         if signals.get('trend'):
-            trend_scores = {
-                'strong_bullish': 100,
-                'bullish': 75,
-                'neutral': 50,
-                'bearish': 25,
-                'strong_bearish': 0
-            }
-            trend_score = trend_scores.get(signals['trend'], 50)
-            score += trend_score * self.indicator_weights['trend_strength']
-            weights_sum += self.indicator_weights['trend_strength']
+            trend_score = _TREND_SCORES.get(signals['trend'], 50)
+            score += trend_score * w_trend
+            weights_sum += w_trend
         
         # VWAP position
         if signals.get('vwap') and market_data.get('ticker'):
@@ -117,8 +310,8 @@ class SignalStrengthCalculator:
             vwap_score = 50 + (vwap_ratio * 1000)  # Scale it
             vwap_score = max(0, min(100, vwap_score))
             
-            score += vwap_score * self.indicator_weights['vwap_position']
-            weights_sum += self.indicator_weights['vwap_position']
+            score += vwap_score * w_vwap
+            weights_sum += w_vwap
         
         return (score / weights_sum * 100) if weights_sum > 0 else 50
     
@@ -126,6 +319,7 @@ class SignalStrengthCalculator:
         """Calculate momentum score."""
         score = 0
         weights_sum = 0
+        w_rsi, w_macd = self._momentum_w
         
         # RSI
         if signals.get('rsi_14') is not None:
@@ -138,19 +332,14 @@ class SignalStrengthCalculator:
             else:
                 rsi_score = 50 + (50 - rsi) * (50/40)  # Linear scale
             
-            score += rsi_score * self.indicator_weights['rsi']
-            weights_sum += self.indicator_weights['rsi']
+            score += rsi_score * w_rsi
+            weights_sum += w_rsi
         
         # MACD
         if signals.get('macd_divergence'):
-            divergence_scores = {
-                'bullish': 90,
-                'bearish': 10,
-                'none': 50
-            }
-            macd_score = divergence_scores.get(signals['macd_divergence'], 50)
-            score += macd_score * self.indicator_weights['macd']
-            weights_sum += self.indicator_weights['macd']
+            macd_score = _DIVERGENCE_SCORES.get(signals['macd_divergence'], 50)
+            score += macd_score * w_macd
+            weights_sum += w_macd
         
         return (score / weights_sum * 100) if weights_sum > 0 else 50
     
@@ -158,23 +347,19 @@ class SignalStrengthCalculator:
         """Calculate volatility score."""
         score = 0
         weights_sum = 0
+        w_position, w_squeeze = self._volatility_w
         
         # Bollinger Bands position
         if signals.get('bb_position'):
-            position_scores = {
-                'below': 80,   # Below lower band - oversold
-                'inside': 50,  # Inside bands - neutral
-                'above': 20    # Above upper band - overbought
-            }
-            bb_score = position_scores.get(signals['bb_position'], 50)
-            score += bb_score * self.indicator_weights['bb_position']
-            weights_sum += self.indicator_weights['bb_position']
+            bb_score = _BB_POSITION_SCORES.get(signals['bb_position'], 50)
+            score += bb_score * w_position
+            weights_sum += w_position
         
         # Bollinger Bands squeeze
         if signals.get('bb_squeeze'):
             squeeze_score = 80 if signals['bb_squeeze'] else 50
-            score += squeeze_score * self.indicator_weights['bb_squeeze']
-            weights_sum += self.indicator_weights['bb_squeeze']
+            score += squeeze_score * w_squeeze
+            weights_sum += w_squeeze
         
         return (score / weights_sum * 100) if weights_sum > 0 else 50
     
@@ -182,31 +367,28 @@ class SignalStrengthCalculator:
         """Calculate volume score."""
         score = 0
         weights_sum = 0
+        w_spike, w_trend, w_imbalance = self._volume_w
         
         # Volume spike
         if signals.get('volume_spike'):
             spike_score = 80 if signals['volume_spike'] else 50
-            score += spike_score * self.indicator_weights['volume_spike']
-            weights_sum += self.indicator_weights['volume_spike']
+            score += spike_score * w_spike
+            weights_sum += w_spike
         
         # Volume trend
         if signals.get('volume_trend'):
-            trend_scores = {
-                'increasing': 70,
-                'decreasing': 30,
-                'neutral': 50
-            }
-            volume_trend_score = trend_scores.get(signals['volume_trend'], 50)
-            score += volume_trend_score * self.indicator_weights['volume_trend']
-            weights_sum += self.indicator_weights['volume_trend']
+            volume_trend_score = _VOLUME_TREND_SCORES.get(signals['volume_trend'], 50)
+            score += volume_trend_score * w_trend
+            weights_sum += w_trend
         
         # Order book imbalance
-        if market_data.get('order_book', {}).get('imbalance'):
-            imbalance = market_data['order_book']['imbalance']['level_5']['imbalance']
+        imbalance_levels = market_data.get('order_book', {}).get('imbalance')
+        if imbalance_levels:
+            imbalance = imbalance_levels['level_5']['imbalance']
             # Convert imbalance to score (-1 to 1 -> 0 to 100)
             imbalance_score = (imbalance + 1) * 50
-            score += imbalance_score * self.indicator_weights['order_book_imbalance']
-            weights_sum += self.indicator_weights['order_book_imbalance']
+            score += imbalance_score * w_imbalance
+            weights_sum += w_imbalance
         
         return (score / weights_sum * 100) if weights_sum > 0 else 50
     
@@ -214,19 +396,17 @@ class SignalStrengthCalculator:
         """Calculate pattern recognition score."""
         score = 0
         weights_sum = 0
+        w_pattern = self._pattern_w
         
         # Candlestick patterns
-        pattern_scores = {
-            'bullish': 80,
-            'bearish': 20,
-            'none': 50
-        }
-        
-        for pattern_type in ['pattern_engulfing', 'pattern_pin_bar', 'pattern_breakout']:
-            if signals.get(pattern_type):
-                pattern_score = pattern_scores.get(signals[pattern_type], 50)
-                score += pattern_score * self.indicator_weights['candlestick_pattern']
-                weights_sum += self.indicator_weights['candlestick_pattern']
+        get_score = _PATTERN_SCORES.get
+        get_signal = signals.get
+        for pattern_type in _CANDLE_PATTERNS:
+            pattern = get_signal(pattern_type)
+            if pattern:
+                pattern_score = get_score(pattern, 50)
+                score += pattern_score * w_pattern
+                weights_sum += w_pattern
         
         return (score / weights_sum * 100) if weights_sum > 0 else 50
     
@@ -235,14 +415,8 @@ class SignalStrengthCalculator:
         if not sentiment:
             return 50
         
-        sentiment_scores = {
-            'bullish': 70,
-            'bearish': 30,
-            'neutral': 50
-        }
-        
         overall_sentiment = sentiment.get('overall_sentiment', 'neutral')
-        return sentiment_scores.get(overall_sentiment, 50)
+        return _SENTIMENT_SCORES.get(overall_sentiment, 50)
     
     def _calculate_sentiment_penalty(self, sentiment: Dict, signals: Dict) -> float:
         """Calculate penalty for sentiment misalignment."""
@@ -262,26 +436,15 @@ class SignalStrengthCalculator:
     
     def _get_signal_direction(self, signals: Dict) -> str:
         """Determine overall signal direction."""
-        bullish_count = 0
-        bearish_count = 0
-        
-        # Count directional signals
-        direction_indicators = {
-            'ema_crossover': signals.get('ema_crossover'),
-            'macd_divergence': signals.get('macd_divergence'),
-            'pattern_engulfing': signals.get('pattern_engulfing'),
-            'trend': signals.get('trend')
-        }
-        
-        for indicator, value in direction_indicators.items():
-            if value in ['bullish', 'strong_bullish']:
-                bullish_count += 1
-            elif value in ['bearish', 'strong_bearish']:
-                bearish_count += 1
+        # Net count of directional signals
+        get = signals.get
+        tally = 0
+        for value in (get('ema_crossover'), get('macd_divergence'), get('pattern_engulfing'), get('trend')):
+            tally += (value in _BULLISH) - (value in _BEARISH)
         
-        if bullish_count > bearish_count:
+        if tally > 0:
             return 'bullish'
-        elif bearish_count > bullish_count:
+        elif tally < 0:
             return 'bearish'
         else:
             return 'neutral'
@@ -1,36 +1,94 @@
 # src/simple_indicators.py
 import pandas as pd
 import numpy as np
-import ta
+from collections import deque
 from typing import Dict
 from config.settings import Config
+from src.indicators import _new_price_state, _seed_price_state, _resume_index, _step_price_state
 
 
 class SimpleIndicators:
     """Simplified technical indicators for basic trading."""
     
+    EMA_SPANS = (9, 21)
+    RSI_PERIODS = (5, 14)
+    ATR_PERIOD = 14
+    VOLUME_WINDOW = 20
+    
     def __init__(self):
         self.indicators = {}
+        
+        # Running indicator state after the last closed bar
+        self._state = None
     
     def calculate_all_indicators(self, df: pd.DataFrame) -> Dict:
         """Calculate basic technical indicators."""
+        high = np.ascontiguousarray(df['high'].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(df['low'].to_numpy(dtype=np.float64))
+        close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+        volume = df['volume'].to_numpy(dtype=np.float64)
+        times = df['timestamp'].to_numpy() if 'timestamp' in df.columns else None
+        
+        # Only bars closed since the previous call are folded into the state;
+        # the first call (or a frame that does not continue it) seeds it
+        start = _resume_index(self._state, times, close)
+        if start is None:
+            self._state = self._seed_state(high[:-1], low[:-1], close[:-1], volume[:-1])
+            self._state['time'] = times[-2] if times is not None and len(times) > 1 else None
+            start = len(close) - 1
+        
+        for i in range(start, len(close) - 1):
+            self._state = self._step(self._state, high[i], low[i], close[i])
+            self._state['volumes'].append(volume[i])
+            self._state['time'] = times[i] if times is not None else None
+        
+        return self.update(high[-1], low[-1], close[-1], volume[-1])
+    
+    def update(self, high: float, low: float, close: float, volume: float) -> Dict:
+        """Calculate indicators for the current bar on top of the closed-bar state."""
+        if self._state is None:
+            self._state = self._new_state()
+        
+        state = self._step(self._state, high, low, close)
         self.indicators = {}
         
         # Basic indicators
-        self.calculate_moving_averages(df)
-        self.calculate_rsi(df)
-        self.calculate_volume_indicators(df)
-        self.calculate_atr(df)
+        self.calculate_moving_averages(state)
+        self.calculate_rsi(state)
+        self.calculate_volume_indicators(volume)
+        self.calculate_atr(state, close)
         
         # Simple trend detection
-        self.calculate_trend(df)
+        self.calculate_trend(state, close)
         
         return self.indicators
     
-    def calculate_moving_averages(self, df: pd.DataFrame):
+    def _new_state(self) -> Dict:
+        """Empty indicator state, before any bar."""
+        state = _new_price_state(self.EMA_SPANS, self.RSI_PERIODS, (self.ATR_PERIOD,))
+        state['volumes'] = deque(maxlen=self.VOLUME_WINDOW - 1)
+        return state
+    
+    def _seed_state(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, volume: np.ndarray) -> Dict:
+        """Indicator state after the given closed bars, computed by the compiled kernels."""
+        state = self._new_state()
+        if not len(close):
+            return state
+        
+        _seed_price_state(state, high, low, close)
+        state['volumes'].extend(volume[-state['volumes'].maxlen:])
+        return state
+    
+    def _step(self, state: Dict, high: float, low: float, close: float) -> Dict:
+        """Advance the state by one bar, returning the new state."""
+        new_state = _step_price_state(state, high, low, close)
+        new_state['volumes'] = state['volumes']
+        return new_state
+    
+    def calculate_moving_averages(self, state: Dict):
         """Calculate EMAs."""
-        self.indicators['ema_9'] = df['close'].ewm(span=9).mean().iloc[-1]
-        self.indicators['ema_21'] = df['close'].ewm(span=21).mean().iloc[-1]
+        for span, (num, weight) in state['ema'].items():
+            self.indicators[f'ema_{span}'] = num / weight
         
         # Basic trend
         if self.indicators['ema_9'] > self.indicators['ema_21']:
@@ -38,42 +96,44 @@ class SimpleIndicators:
         else:
             self.indicators['ema_trend'] = 'bearish'
     
-    def calculate_rsi(self, df: pd.DataFrame):
+    def calculate_rsi(self, state: Dict):
         """Calculate RSI."""
-        for period in [5, 14]:
-            rsi_value = ta.momentum.RSIIndicator(
-                close=df['close'], 
-                window=period
-            ).rsi().iloc[-1]
+        for period, (bars, avg_gain, avg_loss) in state['rsi'].items():
+            if bars < period:
+                rsi_value = np.nan
+            elif avg_loss == 0:
+                rsi_value = 100.0
+            else:
+                rsi_value = 100 - 100 / (1 + avg_gain / avg_loss)
             
             self.indicators[f'rsi_{period}'] = rsi_value
     
-    def calculate_volume_indicators(self, df: pd.DataFrame):
+    def calculate_volume_indicators(self, volume: float):
         """Calculate volume indicators."""
-        # Volume ratio
-        volume_sma = df['volume'].rolling(window=20).mean()
-        self.indicators['volume_ratio'] = df['volume'].iloc[-1] / volume_sma.iloc[-1] if volume_sma.iloc[-1] > 0 else 1
+        # Volume ratio against the 20-bar average including the current bar
+        volumes = self._state['volumes']
+        if len(volumes) == volumes.maxlen:
+            volume_sma = (sum(volumes) + volume) / self.VOLUME_WINDOW
+            self.indicators['volume_ratio'] = volume / volume_sma if volume_sma > 0 else 1
+        else:
+            self.indicators['volume_ratio'] = 1
         
         # Volume spike detection
         self.indicators['volume_spike'] = self.indicators['volume_ratio'] > Config.VOLUME_SPIKE_THRESHOLD
     
-    def calculate_atr(self, df: pd.DataFrame):
+    def calculate_atr(self, state: Dict, close: float):
         """Calculate ATR."""
-        atr_indicator = ta.volatility.AverageTrueRange(
-            high=df['high'], 
-            low=df['low'], 
-            close=df['close'], 
-            window=14
-        )
-        self.indicators['atr'] = atr_indicator.average_true_range().iloc[-1]
+        bars, value = state['atr'][self.ATR_PERIOD]
+        self.indicators['atr'] = value if bars >= self.ATR_PERIOD else np.nan
         
         # ATR percentage
-        self.indicators['atr_percent'] = self.indicators['atr'] / df['close'].iloc[-1] * 100
+        self.indicators['atr_percent'] = self.indicators['atr'] / close * 100
     
-    def calculate_trend(self, df: pd.DataFrame):
+    def calculate_trend(self, state: Dict, close: float):
         """Simple trend detection."""
         # Price change
-        self.indicators['price_change'] = df['close'].pct_change().iloc[-1] * 100
+        prev_close = state['prev_close']
+        self.indicators['price_change'] = (close - prev_close) / prev_close * 100 if prev_close is not None else np.nan
         
         # Basic trend
         if self.indicators['ema_trend'] == 'bullish' and self.indicators['price_change'] > 0:
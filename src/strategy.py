@@ -1,10 +1,69 @@
 # src/strategy.py
 import pandas as pd
 import numpy as np
-import ta
 from typing import Dict, List
 from datetime import datetime
 from config.settings import Config
+from src._indicators_njit import (
+    _ema_state_loop, _wilder_rsi_state_loop, _wilder_atr_state_loop, _volume_profile_loop
+)
+
+
+# Indicator periods as kernel inputs, so each kernel covers all of them in one pass
+_RSI_PERIODS = np.array(Config.RSI_PERIODS, dtype=np.int64)
+_ATR_PERIODS = np.array((Config.ATR_PERIOD, Config.ATR_PERIOD_SHORT), dtype=np.int64)
+
+
+def _wilder_rsi(close: np.ndarray, periods: np.ndarray) -> List[float]:
+    """Latest Wilder RSI per period (same values as ta's RSIIndicator)."""
+    bars, avg_gains, avg_losses = _wilder_rsi_state_loop(close, periods)
+    values = []
+    for period, avg_gain, avg_loss in zip(periods.tolist(), avg_gains.tolist(), avg_losses.tolist()):
+        if bars < period:
+            values.append(np.nan)
+        elif avg_loss == 0:
+            values.append(100.0)
+        else:
+            values.append(100 - 100 / (1 + avg_gain / avg_loss))
+    return values
+
+
+def _wilder_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, periods: np.ndarray) -> List[float]:
+    """Latest Wilder ATR per period, seeded with the mean of the first period (same values as ta's AverageTrueRange)."""
+    bars, values = _wilder_atr_state_loop(high, low, close, periods)
+    return [value if bars >= period else np.nan for period, value in zip(periods.tolist(), values.tolist())]
+
+
+def _session_features(hour_utc: int) -> Dict:
+    """Trading session features for an hour of the day (UTC)."""
+    features = {
+        'session_asia': Config.ASIAN_SESSION[0] <= hour_utc < Config.ASIAN_SESSION[1],
+        'session_europe': Config.EUROPEAN_SESSION[0] <= hour_utc < Config.EUROPEAN_SESSION[1],
+        'session_us': Config.US_SESSION[0] <= hour_utc < Config.US_SESSION[1],
+        'high_liquidity': Config.HIGH_LIQUIDITY_HOURS[0] <= hour_utc < Config.HIGH_LIQUIDITY_HOURS[1]
+    }
+    
+    # Session overlaps
+    features['session_overlap'] = (
+        (features['session_europe'] and features['session_us']) or
+        (features['session_asia'] and features['session_europe'])
+    )
+    
+    # Current session name
+    if features['session_asia']:
+        features['current_session'] = 'Asia'
+    elif features['session_europe']:
+        features['current_session'] = 'Europe'
+    elif features['session_us']:
+        features['current_session'] = 'US'
+    else:
+        features['current_session'] = 'Other'
+    
+    return features
+
+
+# Session features for each hour of the day, looked up instead of recomputed per signal
+_SESSION_FEATURES_BY_HOUR = tuple(_session_features(hour) for hour in range(24))
 
 
 class TradingStrategy:
@@ -23,122 +82,103 @@ class TradingStrategy:
         # Add session and time features
         self._add_session_features(df)
         
-        # Initialize signal
-        signal = {
-            'action': None,
-            'side': None,
-            'reason': '',
-            'entry_price': df['close'].iloc[-1],
-            'stop_loss': None,
-            'take_profit': None,
-            'confidence': 0.0,
-            'indicators': self.indicators
-        }
+        # Raw columns for the tail reads below, instead of row lookups
+        close = df['close'].to_numpy()
+        volume = df['volume'].to_numpy()
         
         # Check for exit signals first
-        exit_signal = self._check_exit_conditions(positions, df, analysis)
+        exit_signal = self._check_exit_conditions(positions, close, volume, analysis)
         if exit_signal:
             return exit_signal
         
         # Check for entry signals
-        entry_signal = self._check_entry_conditions(df, analysis, positions)
+        entry_signal = self._check_entry_conditions(close, analysis, positions)
         if entry_signal:
             return entry_signal
         
-        return signal
+        # No signal; built only when neither check returned one
+        return {
+            'action': None,
+            'side': None,
+            'reason': '',
+            'entry_price': close[-1],
+            'stop_loss': None,
+            'take_profit': None,
+            'confidence': 0.0,
+            'indicators': self.indicators
+        }
     
     def _calculate_indicators(self, df: pd.DataFrame):
         """Calculate all technical indicators."""
+        high = np.ascontiguousarray(df['high'].to_numpy(dtype=np.float64))
+        low = np.ascontiguousarray(df['low'].to_numpy(dtype=np.float64))
+        close = np.ascontiguousarray(df['close'].to_numpy(dtype=np.float64))
+        volume = np.ascontiguousarray(df['volume'].to_numpy(dtype=np.float64))
+        
         # Calculate RSI for all specified periods
-        for period in Config.RSI_PERIODS:
-            self.indicators[f'rsi_{period}'] = ta.momentum.RSIIndicator(
-                close=df['close'], 
-                window=period
-            ).rsi().iloc[-1]
+        for period, rsi_value in zip(Config.RSI_PERIODS, _wilder_rsi(close, _RSI_PERIODS)):
+            self.indicators[f'rsi_{period}'] = rsi_value
         
-        # EMA trend
-        ema_fast = df['close'].ewm(span=Config.EMA_SHORT).mean()
-        ema_slow = df['close'].ewm(span=Config.EMA_LONG).mean()
+        # EMA trend (pandas ewm(span=...) values)
+        num, weight = _ema_state_loop(close, Config.EMA_SHORT)
+        ema_fast = num / weight
+        num, weight = _ema_state_loop(close, Config.EMA_LONG)
+        ema_slow = num / weight
         
-        self.indicators['ema_fast'] = ema_fast.iloc[-1]
-        self.indicators['ema_slow'] = ema_slow.iloc[-1]
+        self.indicators['ema_fast'] = ema_fast
+        self.indicators['ema_slow'] = ema_slow
         
         # Trend direction
-        if ema_fast.iloc[-1] > ema_slow.iloc[-1]:
+        if ema_fast > ema_slow:
             self.indicators['trend'] = 'bullish'
-        elif ema_fast.iloc[-1] < ema_slow.iloc[-1]:
+        elif ema_fast < ema_slow:
             self.indicators['trend'] = 'bearish'
         else:
             self.indicators['trend'] = 'neutral'
         
-        # VWAP
-        vwap = (df['volume'] * (df['high'] + df['low'] + df['close']) / 3).cumsum() / df['volume'].cumsum()
-        self.indicators['vwap'] = vwap.iloc[-1]
+        # VWAP and the 20-bar volume average from one pass over the frame
+        vwap, volume_sma = _volume_profile_loop(high, low, close, volume, 20)
+        self.indicators['vwap'] = vwap
         
         # ATR for different periods
-        self.indicators['atr'] = ta.volatility.AverageTrueRange(
-            high=df['high'], low=df['low'], close=df['close'], 
-            window=Config.ATR_PERIOD
-        ).average_true_range().iloc[-1]
-        
-        self.indicators['atr_short'] = ta.volatility.AverageTrueRange(
-            high=df['high'], low=df['low'], close=df['close'], 
-            window=Config.ATR_PERIOD_SHORT
-        ).average_true_range().iloc[-1]
+        self.indicators['atr'], self.indicators['atr_short'] = _wilder_atr(high, low, close, _ATR_PERIODS)
         
         # Volume analysis
-        volume_sma = df['volume'].rolling(window=20).mean()
-        self.indicators['volume_ratio'] = df['volume'].iloc[-1] / volume_sma.iloc[-1]
+        self.indicators['volume_ratio'] = volume[-1] / volume_sma
         self.indicators['volume_spike'] = self.indicators['volume_ratio'] > Config.VOLUME_SPIKE_THRESHOLD
         
         # Volume spike detection (500% in 1 minute)
-        if len(df) > 1:
-            volume_change = df['volume'].iloc[-1] / df['volume'].iloc[-2]
+        if len(volume) > 1:
+            volume_change = volume[-1] / volume[-2]
             self.indicators['volume_spike_500'] = volume_change > 5.0
         else:
             self.indicators['volume_spike_500'] = False
         
         # Price action
-        self.indicators['price_change'] = (df['close'].iloc[-1] - df['close'].iloc[-2]) / df['close'].iloc[-2] * 100
+        self.indicators['price_change'] = (close[-1] - close[-2]) / close[-2] * 100
     
     def _add_session_features(self, df: pd.DataFrame):
         """Add trading session features."""
-        # Get current hour in UTC
-        current_time = datetime.utcnow()
-        hour_utc = current_time.hour
-        
-        # Check sessions
-        self.indicators['session_asia'] = Config.ASIAN_SESSION[0] <= hour_utc < Config.ASIAN_SESSION[1]
-        self.indicators['session_europe'] = Config.EUROPEAN_SESSION[0] <= hour_utc < Config.EUROPEAN_SESSION[1]
-        self.indicators['session_us'] = Config.US_SESSION[0] <= hour_utc < Config.US_SESSION[1]
-        
-        # Check high liquidity hours
-        self.indicators['high_liquidity'] = Config.HIGH_LIQUIDITY_HOURS[0] <= hour_utc < Config.HIGH_LIQUIDITY_HOURS[1]
-        
-        # Session overlaps
-        self.indicators['session_overlap'] = (
-            (self.indicators['session_europe'] and self.indicators['session_us']) or
-            (self.indicators['session_asia'] and self.indicators['session_europe'])
-        )
-        
-        # Current session name
-        if self.indicators['session_asia']:
-            self.indicators['current_session'] = 'Asia'
-        elif self.indicators['session_europe']:
-            self.indicators['current_session'] = 'Europe'
-        elif self.indicators['session_us']:
-            self.indicators['current_session'] = 'US'
-        else:
-            self.indicators['current_session'] = 'Other'
+        # Get current hour in UTC; the features only depend on it
+        hour_utc = datetime.utcnow().hour
+        self.indicators.update(_SESSION_FEATURES_BY_HOUR[hour_utc])
     
-    def _check_entry_conditions(self, df: pd.DataFrame, analysis: Dict, positions: List[Dict]) -> Dict:
+    def _check_entry_conditions(self, close: np.ndarray, analysis: Dict, positions: List[Dict]) -> Dict:
         """Check for entry conditions with enhanced scalping logic."""
         # Skip if max positions reached
         if len(positions) >= Config.MAX_OPEN_POSITIONS:
             return None
         
-        last = df.iloc[-1]
-        prev = df.iloc[-2]
+        last_close = close[-1]
+        prev_close = close[-2]
+        
+        # Inputs shared by the long and short checks, read once
+        vwap = self.indicators['vwap']
+        volume_spike_500 = self.indicators.get('volume_spike_500', False)
+        price_change = self.indicators['price_change']
+        high_liquidity = self.indicators.get('high_liquidity', False)
+        imbalance = analysis.get('order_book_imbalance', 0)
+        trend = self.indicators['trend']
         
         # Long conditions
         long_score = 0.0
@@ -153,22 +193,22 @@ class TradingStrategy:
             long_reasons.append(f'RSI oversold (5:{rsi_5:.1f}, 7:{rsi_7:.1f})')
         
         # Price bounce from VWAP
-        if last['close'] < self.indicators['vwap'] and last['close'] > prev['close']:
+        if last_close < vwap and last_close > prev_close:
             long_score += 0.25
             long_reasons.append('VWAP bounce')
         
         # Volume spike with price increase
-        if self.indicators.get('volume_spike_500', False) and self.indicators['price_change'] > 0:
+        if volume_spike_500 and price_change > 0:
             long_score += 0.35
             long_reasons.append('Volume spike 500% buy')
         
         # High liquidity hours bonus
-        if self.indicators.get('high_liquidity', False):
+        if high_liquidity:
             long_score += 0.1
             long_reasons.append('High liquidity hours')
         
         # Order book imbalance (buy pressure)
-        if analysis.get('order_book_imbalance', 0) > Config.ORDER_BOOK_IMBALANCE_THRESHOLD:
+        if imbalance > Config.ORDER_BOOK_IMBALANCE_THRESHOLD:
             long_score += 0.3
             long_reasons.append('Buy pressure')
         
@@ -182,73 +222,77 @@ class TradingStrategy:
             short_reasons.append(f'RSI overbought (5:{rsi_5:.1f}, 7:{rsi_7:.1f})')
         
         # Price rejection from VWAP
-        if last['close'] > self.indicators['vwap'] and last['close'] < prev['close']:
+        if last_close > vwap and last_close < prev_close:
             short_score += 0.25
             short_reasons.append('VWAP rejection')
         
         # Volume spike with price decrease
-        if self.indicators.get('volume_spike_500', False) and self.indicators['price_change'] < 0:
+        if volume_spike_500 and price_change < 0:
             short_score += 0.35
             short_reasons.append('Volume spike 500% sell')
         
         # High liquidity hours bonus
-        if self.indicators.get('high_liquidity', False):
+        if high_liquidity:
             short_score += 0.1
             short_reasons.append('High liquidity hours')
         
         # Order book imbalance (sell pressure)
-        if analysis.get('order_book_imbalance', 0) < -Config.ORDER_BOOK_IMBALANCE_THRESHOLD:
+        if imbalance < -Config.ORDER_BOOK_IMBALANCE_THRESHOLD:
             short_score += 0.3
             short_reasons.append('Sell pressure')
         
         # Generate signal
-        if long_score >= 0.7 and self.indicators['trend'] != 'bearish':
-            return self._create_entry_signal('long', long_score, long_reasons, last, analysis)
-        elif short_score >= 0.7 and self.indicators['trend'] != 'bullish':
-            return self._create_entry_signal('short', short_score, short_reasons, last, analysis)
+        if long_score >= 0.7 and trend != 'bearish':
+            return self._create_entry_signal('long', long_score, long_reasons, last_close, analysis)
+        elif short_score >= 0.7 and trend != 'bullish':
+            return self._create_entry_signal('short', short_score, short_reasons, last_close, analysis)
         
         return None
     
-    def _check_exit_conditions(self, positions: List[Dict], df: pd.DataFrame, analysis: Dict) -> Dict:
+    def _check_exit_conditions(self, positions: List[Dict], close: np.ndarray, volume: np.ndarray, 
+                               analysis: Dict) -> Dict:
         """Check for exit conditions."""
         if not positions:
             return None
         
+        # Exit conditions depend only on the position side, so build each once
+        rsi_5 = self.indicators.get('rsi_5', 50)
+        vwap = self.indicators['vwap']
+        volume_exhausted = self.indicators.get('volume_spike_500', False) and volume[-1] < volume[-2]
+        
+        long_exits = []
+        # RSI extreme overbought
+        if rsi_5 > 70:
+            long_exits.append('RSI_5 overbought')
+        
+        # Price above VWAP target
+        if close[-1] > vwap * 1.005:
+            long_exits.append('VWAP target reached')
+        
+        short_exits = []
+        # RSI extreme oversold
+        if rsi_5 < 30:
+            short_exits.append('RSI_5 oversold')
+        
+        # Price below VWAP target
+        if close[-1] < vwap * 0.995:
+            short_exits.append('VWAP target reached')
+        
+        # Volume exhaustion
+        if volume_exhausted:
+            long_exits.append('Volume exhaustion')
+            short_exits.append('Volume exhaustion')
+        
+        exits_by_side = {'long': long_exits, 'short': short_exits}
         for position in positions:
-            exit_conditions = []
-            
-            if position['side'] == 'long':
-                # RSI extreme overbought
-                if self.indicators.get('rsi_5', 50) > 70:
-                    exit_conditions.append('RSI_5 overbought')
-                
-                # Price above VWAP target
-                if df['close'].iloc[-1] > self.indicators['vwap'] * 1.005:
-                    exit_conditions.append('VWAP target reached')
-                
-                # Volume exhaustion
-                if self.indicators.get('volume_spike_500', False) and df['volume'].iloc[-1] < df['volume'].iloc[-2]:
-                    exit_conditions.append('Volume exhaustion')
-            
-            elif position['side'] == 'short':
-                # RSI extreme oversold
-                if self.indicators.get('rsi_5', 50) < 30:
-                    exit_conditions.append('RSI_5 oversold')
-                
-                # Price below VWAP target
-                if df['close'].iloc[-1] < self.indicators['vwap'] * 0.995:
-                    exit_conditions.append('VWAP target reached')
-                
-                # Volume exhaustion
-                if self.indicators.get('volume_spike_500', False) and df['volume'].iloc[-1] < df['volume'].iloc[-2]:
-                    exit_conditions.append('Volume exhaustion')
+            exit_conditions = exits_by_side.get(position['side'])
             
             if exit_conditions:
                 return {
                     'action': 'CLOSE',
                     'side': position['side'],
                     'reason': 'Exit: ' + ', '.join(exit_conditions),
-                    'entry_price': df['close'].iloc[-1],
+                    'entry_price': close[-1],
                     'confidence': 0.9,
                     'indicators': self.indicators
                 }
@@ -256,13 +300,13 @@ class TradingStrategy:
         return None
     
     def _create_entry_signal(self, side: str, confidence: float, reasons: List[str], 
-                           last: pd.Series, analysis: Dict) -> Dict:
+                           last_close: float, analysis: Dict) -> Dict:
         """Create entry signal with proper risk management."""
         # Get spread from analysis
         spread = analysis.get('spread', 0.001)  # Default 0.1% if not available
         
         # Use short-term ATR for stops
-        atr = self.indicators.get('atr_short', self.indicators.get('atr', last['close'] * 0.02))
+        atr = self.indicators.get('atr_short', self.indicators.get('atr', last_close * 0.02))
         
         # Calculate stop loss based on spread and ATR
         spread_based_stop = spread * Config.SPREAD_MULTIPLIER
@@ -270,17 +314,17 @@ class TradingStrategy:
         stop_distance = max(spread_based_stop, atr_based_stop)
         
         if side == 'long':
-            stop_loss = last['close'] * (1 - stop_distance)
-            take_profit = last['close'] * (1 + (stop_distance * 2))
+            stop_loss = last_close * (1 - stop_distance)
+            take_profit = last_close * (1 + (stop_distance * 2))
         else:
-            stop_loss = last['close'] * (1 + stop_distance)
-            take_profit = last['close'] * (1 - (stop_distance * 2))
+            stop_loss = last_close * (1 + stop_distance)
+            take_profit = last_close * (1 - (stop_distance * 2))
         
         return {
             'action': 'OPEN',
             'side': side,
             'reason': f"Scalp {side}: {', '.join(reasons)}",
-            'entry_price': last['close'],
+            'entry_price': last_close,
             'stop_loss': stop_loss,
             'take_profit': take_profit,
             'confidence': confidence,
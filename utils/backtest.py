@@ -52,6 +52,7 @@ class BacktestEngine:
         
         if df is None or df.empty:
             print("Error: No data received")
+            self.market_analyzer.stop()
             return {}
         
         print(f"Loaded {len(df)} candles")
@@ -99,6 +100,9 @@ class BacktestEngine:
         # Close any remaining positions
         self._close_all_positions(df.iloc[-1]['close'], df.iloc[-1]['timestamp'])
         
+        # Stop background sentiment updates
+        self.market_analyzer.stop()
+        
         # Generate report
         return self._generate_backtest_report()
     